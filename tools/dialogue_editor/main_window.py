@@ -14,27 +14,40 @@ Keyboard Shortcuts:
 """
 
 import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QSplitter, QTreeWidget, QTreeWidgetItem, QGraphicsView, QGraphicsScene,
-    QGraphicsRectItem, QGraphicsTextItem, QGraphicsLineItem, QGraphicsEllipseItem,
+    QSplitter, QTreeView, QGraphicsView, QGraphicsScene,
+    QGraphicsItem, QGraphicsRectItem,
+    QGraphicsEllipseItem, QGraphicsPathItem,
     QDockWidget, QFormLayout, QLineEdit, QTextEdit, QComboBox, QPushButton,
-    QLabel, QListWidget, QListWidgetItem, QTabWidget, QScrollArea,
+    QLabel, QListWidget, QListWidgetItem, QListView, QTabWidget, QScrollArea,
     QMenu, QMenuBar, QToolBar, QStatusBar, QFileDialog, QMessageBox,
-    QInputDialog, QGroupBox, QSpinBox, QColorDialog, QFrame
+    QInputDialog, QGroupBox, QSpinBox, QColorDialog, QFrame, QProgressDialog
+)
+from PySide6.QtCore import (
+    Qt, QRectF, QPointF, Signal, QTimer, QStringListModel, QSignalBlocker,
+    QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QEventLoop
 )
-from PySide6.QtCore import Qt, QRectF, QPointF, Signal, QTimer
 from PySide6.QtGui import (
     QAction, QKeySequence, QColor, QPen, QBrush, QFont,
-    QPainter, QWheelEvent, QMouseEvent, QShortcut
+    QPainter, QPainterPath, QWheelEvent, QMouseEvent, QShortcut, QStaticText,
+    QFontMetricsF, QTextOption, QSurfaceFormat, QPalette
 )
 
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  # Qt built without OpenGL support - keep the raster viewport
+    QOpenGLWidget = None
+
 from .models import (
     Project, Dialogue, DialogueNode, Character,
-    NodeType, ChoiceOption, NodePosition
+    NodeType, ChoiceOption, NodePosition, Edge
 )
 from .yaml_io import DialogueYAMLLoader, DialogueYAMLSaver
 
@@ -43,6 +56,26 @@ from .yaml_io import DialogueYAMLLoader, DialogueYAMLSaver
 # GRAPH ITEMS
 # ============================================================================
 
+# Shared pens/brushes - built once instead of per node/edge refresh
+PEN_NODE = QPen(Qt.GlobalColor.black, 2)
+PEN_NEXT = QPen(QColor("#ffffff"), 2)
+PEN_CHOICE = QPen(QColor("#ff9f4a"), 2)  # Orange for choices
+PEN_THEN = QPen(QColor("#4aff4a"), 2)  # Green for then
+PEN_ELSE = QPen(QColor("#ff4a4a"), 2)  # Red for else
+PEN_JUMP = QPen(QColor("#4aff9f"), 2, Qt.PenStyle.DashLine)
+BRUSH_DEFAULT = QBrush(QColor("#888888"))
+
+
+@lru_cache(maxsize=4096)
+def _truncate_lines(text: str, max_lines: int = 3) -> str:
+    """Truncate text to max lines."""
+    lines = text.split('\n')
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1][:40] + "..." if len(lines[-1]) > 40 else lines[-1] + "..."
+    return '\n'.join(lines)
+
+
 class NodeGraphicsItem(QGraphicsRectItem):
     """Visual representation of a dialogue node in the graph."""
     
@@ -73,109 +106,151 @@ class NodeGraphicsItem(QGraphicsRectItem):
         QColor("#98fb98"),  # Pale green
     ]
     
-    # Class-level speaker color mapping
+    TYPE_BRUSHES = {t: QBrush(c) for t, c in TYPE_COLORS.items()}
+    SPEAKER_BRUSHES = [QBrush(c) for c in SPEAKER_COLORS]
+    
+    # Class-level speaker -> color index mapping
     _speaker_color_map: dict = {}
     
+    # Shared fonts for node text
+    TITLE_FONT = QFont()
+    TITLE_FONT.setBold(True)
+    CONTENT_FONT = QFont()
+    _content_metrics: Optional[QFontMetricsF] = None  # Created on first use (needs a QApplication)
+    
+    # Text origins inside the node rect
+    TITLE_POS = QPointF(9, 6)
+    CONTENT_POS = QPointF(9, 24)
+    
+    # Zoom levels below which text is too small to read and is skipped
+    LOD_TITLE = 0.4
+    LOD_CONTENT = 0.8
+    
     def __init__(self, node: DialogueNode, parent=None):
         super().__init__(0, 0, self.NODE_WIDTH, self.MIN_HEIGHT, parent)
         self.node = node
         self._height = self.MIN_HEIGHT
         self.setPos(node.ui_pos.x, node.ui_pos.y)
         self._graph_view = None  # Will be set by graph view
+        self._last_render_key = None  # Skips text re-layout when nothing changed
         
         # Make movable
         self.setFlag(QGraphicsRectItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsRectItem.GraphicsItemFlag.ItemIsSelectable)
         self.setFlag(QGraphicsRectItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        self.setFlag(QGraphicsRectItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)  # Fills exposedRect
         
         # Styling
-        self.setPen(QPen(Qt.GlobalColor.black, 2))
-        
-        # Title text
-        self.title_text = QGraphicsTextItem(self)
-        self.title_text.setPos(5, 2)
-        self.title_text.setDefaultTextColor(Qt.GlobalColor.white)
-        font = QFont()
-        font.setBold(True)
-        self.title_text.setFont(font)
-        
-        # Content text
-        self.content_text = QGraphicsTextItem(self)
-        self.content_text.setPos(5, 20)
-        self.content_text.setDefaultTextColor(Qt.GlobalColor.white)
-        self.content_text.setTextWidth(self.NODE_WIDTH - 10)
+        self.setPen(PEN_NODE)
+        
+        # Title and content are painted directly; QStaticText keeps the glyph layout
+        self._title_static = QStaticText()
+        self._title_static.setTextFormat(Qt.TextFormat.PlainText)
+        self._content_lines: list[tuple[QPointF, QStaticText]] = []  # (origin, line), no word-wrap layout
+        self._content_texts: list[str] = []  # Unelided text of each content line, for reuse
+        
+        # Cache the rendered node as a pixmap; invalidated via update()
+        self.setCacheMode(QGraphicsRectItem.CacheMode.DeviceCoordinateCache)
         
         self.update_display()
     
     @classmethod
-    def get_speaker_color(cls, speaker: str) -> QColor:
-        """Get a consistent color for a speaker."""
+    def _speaker_color_index(cls, speaker: str) -> int:
+        """Get a consistent color index for a speaker."""
         if not speaker:
-            return QColor("#4a9eff")  # Default blue
+            return 0  # Default blue
         if speaker not in cls._speaker_color_map:
-            color_index = len(cls._speaker_color_map) % len(cls.SPEAKER_COLORS)
-            cls._speaker_color_map[speaker] = cls.SPEAKER_COLORS[color_index]
+            cls._speaker_color_map[speaker] = len(cls._speaker_color_map) % len(cls.SPEAKER_COLORS)
         return cls._speaker_color_map[speaker]
     
-    def _truncate_lines(self, text: str, max_lines: int = 3) -> str:
-        """Truncate text to max lines."""
-        lines = text.split('\n')
-        if len(lines) > max_lines:
-            lines = lines[:max_lines]
-            lines[-1] = lines[-1][:40] + "..." if len(lines[-1]) > 40 else lines[-1] + "..."
-        return '\n'.join(lines)
+    @classmethod
+    def get_speaker_color(cls, speaker: str) -> QColor:
+        """Get a consistent color for a speaker."""
+        return cls.SPEAKER_COLORS[cls._speaker_color_index(speaker)]
     
-    def update_display(self):
-        """Update the visual representation."""
+    @classmethod
+    def get_speaker_brush(cls, speaker: str) -> QBrush:
+        """Get the shared brush for a speaker's color."""
+        return cls.SPEAKER_BRUSHES[cls._speaker_color_index(speaker)]
+    
+    def update_display(self) -> bool:
+        """Update the visual representation. Returns True if the node's height changed."""
         node = self.node
         
-        # Title
-        type_name = node.type.name
-        self.title_text.setPlainText(f"[{type_name}] {node.id}")
+        # Content preview, truncated to max lines
+        content = _truncate_lines(node.display_content, self.MAX_LINES)
         
-        # Content preview
-        content = ""
-        if node.type == NodeType.SAY:
-            speaker = node.speaker or "???"
-            text = node.text[:80] + "..." if len(node.text) > 80 else node.text
-            content = f"{speaker}: {text}"
-        elif node.type == NodeType.CHOICE:
-            # Show numbered choices
-            choice_lines = []
-            for i, choice in enumerate(node.choices[:self.MAX_LINES], 1):
-                choice_text = choice.text[:50] + "..." if len(choice.text) > 50 else choice.text
-                target = f" → {choice.next}" if choice.next else ""
-                choice_lines.append(f"{i}. {choice_text}{target}")
-            if len(node.choices) > self.MAX_LINES:
-                choice_lines.append(f"... +{len(node.choices) - self.MAX_LINES} more")
-            content = '\n'.join(choice_lines) if choice_lines else "(no choices)"
-        elif node.type == NodeType.SET:
-            content = ", ".join(f"{k}={v}" for k, v in list(node.assignments.items())[:2])
-        elif node.type == NodeType.IF:
-            content = f"if {node.condition}"
-        elif node.type == NodeType.JUMP:
-            content = f"→ {node.jump_target}"
-        elif node.type == NodeType.END:
-            content = f"END: {node.outcome}" if node.outcome else "END"
-        elif node.type == NodeType.SIGNAL:
-            content = f"signal: {node.signal_name}"
-        
-        # Truncate to max lines
-        content = self._truncate_lines(content, self.MAX_LINES)
-        self.content_text.setPlainText(content)
+        # Nothing visible changed - skip the text re-layout
+        render_key = (node.type, node.id, node.speaker, content)
+        last_key = self._last_render_key
+        if render_key == last_key:
+            return False
+        self._last_render_key = render_key
+        
+        # Title (only re-laid out when type or id changed)
+        if last_key is None or last_key[:2] != render_key[:2]:
+            self._title_static.setText(f"[{node.type.name}] {node.id}")
+            self._title_static.prepare(font=self.TITLE_FONT)
+        
+        # Content lines; unchanged lines keep their prepared QStaticText
+        texts = content.split('\n')
+        old_texts, old_lines = self._content_texts, self._content_lines
+        x, y = self.CONTENT_POS.x(), self.CONTENT_POS.y()
+        self._content_lines = [
+            old_lines[i] if i < len(old_texts) and old_texts[i] == line
+            else (QPointF(x, y + i * self.LINE_HEIGHT), self._make_content_line(line))
+            for i, line in enumerate(texts)
+        ]
+        self._content_texts = texts
         
         # Calculate dynamic height
-        line_count = content.count('\n') + 1
-        content_height = line_count * self.LINE_HEIGHT
-        self._height = max(self.MIN_HEIGHT, 25 + content_height)
-        self.setRect(0, 0, self.NODE_WIDTH, self._height)
+        content_height = len(texts) * self.LINE_HEIGHT
+        height = max(self.MIN_HEIGHT, 25 + content_height)
+        height_changed = height != self._height
+        if height_changed:
+            self._height = height
+            self.setRect(0, 0, self.NODE_WIDTH, self._height)
         
         # Update color based on type or speaker
         if node.type == NodeType.SAY:
-            color = self.get_speaker_color(node.speaker)
+            brush = self.get_speaker_brush(node.speaker)
         else:
-            color = self.TYPE_COLORS.get(node.type, QColor("#888888"))
-        self.setBrush(QBrush(color))
+            brush = self.TYPE_BRUSHES.get(node.type, BRUSH_DEFAULT)
+        self.setBrush(brush)
+        self.update()
+        return height_changed
+    
+    @classmethod
+    def _make_content_line(cls, line: str) -> QStaticText:
+        """Build a plain-text static line, elided to the node width if needed."""
+        if cls._content_metrics is None:
+            cls._content_metrics = QFontMetricsF(cls.CONTENT_FONT)
+        max_width = cls.NODE_WIDTH - 2 * cls.CONTENT_POS.x()
+        if cls._content_metrics.horizontalAdvance(line) > max_width:
+            line = cls._content_metrics.elidedText(line, Qt.TextElideMode.ElideRight, max_width)
+        static = QStaticText(line)
+        static.setTextFormat(Qt.TextFormat.PlainText)
+        static.setTextOption(QTextOption(Qt.AlignmentFlag.AlignLeft))
+        static.prepare(font=cls.CONTENT_FONT)
+        return static
+    
+    def paint(self, painter: QPainter, option, widget=None):
+        """Paint the node rect and its text in a single pass."""
+        if not option.exposedRect.intersects(self.boundingRect()):
+            return
+        super().paint(painter, option, widget)
+        
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod < self.LOD_TITLE:
+            return
+        painter.setPen(Qt.GlobalColor.white)
+        painter.setFont(self.TITLE_FONT)
+        painter.drawStaticText(self.TITLE_POS, self._title_static)
+        if lod < self.LOD_CONTENT:
+            return
+        painter.setFont(self.CONTENT_FONT)
+        for origin, line in self._content_lines:
+            painter.drawStaticText(origin, line)
     
     def itemChange(self, change, value):
         """Handle position changes."""
@@ -183,9 +258,10 @@ class NodeGraphicsItem(QGraphicsRectItem):
             pos = value
             self.node.ui_pos.x = pos.x()
             self.node.ui_pos.y = pos.y()
-            # Notify graph view to update connections during drag
+            # Notify graph view to update this node's connections during drag
             if self._graph_view:
-                self._graph_view.update_connections()
+                self._graph_view.schedule_connections_update(self.node.id)
+                self._graph_view.update_spatial_grid(self)
         return super().itemChange(change, value)
     
     def get_output_point(self) -> QPointF:
@@ -207,43 +283,76 @@ class NodeGraphicsItem(QGraphicsRectItem):
         return self.scenePos() + QPointF(x_offset, self._height)
 
 
-class ConnectionLine(QGraphicsLineItem):
-    """Visual connection between nodes with optional choice number label."""
+class ConnectionLine:
+    """Connection between nodes with optional choice number label.
+    
+    Not a scene item itself: NodeGraphView batches all lines of one kind
+    into a single path item and draws every label in one ConnectionLabels item.
+    """
     
     def __init__(self, start_item: NodeGraphicsItem, end_item: NodeGraphicsItem, 
-                 choice_index: Optional[int] = None):
-        super().__init__()
+                 choice_index: Optional[int] = None, kind: str = "next"):
         self.start_item = start_item
         self.end_item = end_item
         self.choice_index = choice_index  # None for regular connections, 0-based for choices
-        self.setPen(QPen(Qt.GlobalColor.white, 2))
-        
-        # Label for choice number
-        self.label: Optional[QGraphicsTextItem] = None
-        if choice_index is not None:
-            self.label = QGraphicsTextItem(str(choice_index + 1))
-            self.label.setDefaultTextColor(Qt.GlobalColor.white)
-            font = QFont()
-            font.setBold(True)
-            font.setPointSize(10)
-            self.label.setFont(font)
+        self.kind = kind  # Key into NodeGraphView.EDGE_PENS
+        self.label: Optional[str] = str(choice_index + 1) if choice_index is not None else None
+        self.key = (start_item.node.id, end_item.node.id, kind, choice_index)
+        self.start = QPointF()
+        self.end = QPointF()
         
         self.update_position()
     
     def update_position(self):
-        """Update line position based on node positions."""
+        """Update line endpoints based on node positions."""
         if self.choice_index is not None:
-            start = self.start_item.get_choice_output_point(self.choice_index)
+            self.start = self.start_item.get_choice_output_point(self.choice_index)
         else:
-            start = self.start_item.get_output_point()
-        end = self.end_item.get_input_point()
-        self.setLine(start.x(), start.y(), end.x(), end.y())
-        
-        # Update label position to middle of line
-        if self.label:
-            mid_x = (start.x() + end.x()) / 2 - 6
-            mid_y = (start.y() + end.y()) / 2 - 8
-            self.label.setPos(mid_x, mid_y)
+            self.start = self.start_item.get_output_point()
+        self.end = self.end_item.get_input_point()
+    
+    def label_center(self) -> QPointF:
+        """Get the label position (middle of the line)."""
+        return (self.start + self.end) / 2
+
+
+class ConnectionLabels(QGraphicsItem):
+    """Draws the choice number labels of all connections in one item."""
+    
+    LABEL_SIZE = 20
+    
+    FONT = QFont()
+    FONT.setBold(True)
+    FONT.setPointSize(10)
+    
+    def __init__(self):
+        super().__init__()
+        self._labels: list[tuple[QPointF, str]] = []
+        self._rect = QRectF()
+    
+    def set_lines(self, lines: list[ConnectionLine]):
+        """Take label positions and texts from the given lines."""
+        self.prepareGeometryChange()
+        self._labels = [(line.label_center(), line.label) for line in lines if line.label]
+        half = self.LABEL_SIZE / 2
+        rect = QRectF()
+        for center, _ in self._labels:
+            rect = rect.united(QRectF(center.x() - half, center.y() - half, self.LABEL_SIZE, self.LABEL_SIZE))
+        self._rect = rect
+        self.update()
+    
+    def boundingRect(self) -> QRectF:
+        return self._rect
+    
+    def paint(self, painter: QPainter, option, widget=None):
+        painter.setPen(Qt.GlobalColor.white)
+        painter.setFont(self.FONT)
+        half = self.LABEL_SIZE / 2
+        for center, text in self._labels:
+            painter.drawText(
+                QRectF(center.x() - half, center.y() - half, self.LABEL_SIZE, self.LABEL_SIZE),
+                Qt.AlignmentFlag.AlignCenter, text
+            )
 
 
 # ============================================================================
@@ -255,16 +364,45 @@ class NodeGraphView(QGraphicsView):
     
     node_selected = Signal(str)  # node_id
     node_double_clicked = Signal(str)  # node_id
+    node_added = Signal(str)  # node_id
+    node_removed = Signal(str)  # node_id
+    
+    GRID_CELL_SIZE = 500
+    
+    # Pen per connection kind; all lines of a kind share one path item
+    EDGE_PENS = {
+        "next": PEN_NEXT,
+        "choice": PEN_CHOICE,
+        "then": PEN_THEN,
+        "else": PEN_ELSE,
+        "jump": PEN_JUMP,
+    }
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
+        # Nodes are tracked in node_items; skip BSP index rebuilds on every drag
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         
         # Settings
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        
+        # Hardware-accelerated viewport when available; GL redraws the whole
+        # frame anyway, so skip the per-item dirty region bookkeeping
+        if QOpenGLWidget is not None:
+            gl_viewport = QOpenGLWidget()
+            # The GL paint engine only antialiases through multisampling
+            gl_format = QSurfaceFormat()
+            gl_format.setSamples(4)
+            gl_viewport.setFormat(gl_format)
+            self.setViewport(gl_viewport)
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        else:
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         
         # Scene background and large scene rect for unrestricted panning
@@ -273,7 +411,22 @@ class NodeGraphView(QGraphicsView):
         
         # Items tracking
         self.node_items: dict[str, NodeGraphicsItem] = {}
-        self.connection_lines: list[ConnectionLine] = []
+        self._edges: dict[str, list[Edge]] = {}  # Outgoing edges by source node ID
+        self._conn_items: dict[tuple, ConnectionLine] = {}  # ConnectionLine.key -> line
+        self._edges_by_node: dict[str, list[ConnectionLine]] = defaultdict(list)
+        self._edge_paths: dict[str, QGraphicsPathItem] = {}
+        self._edge_labels: Optional[ConnectionLabels] = None
+        
+        # Coarse grid of node items for click hit-testing
+        self._spatial_grid: dict[tuple[int, int], list[NodeGraphicsItem]] = defaultdict(list)
+        self._grid_cells: dict[str, list[tuple[int, int]]] = {}
+        
+        # Drag updates are coalesced to at most one per frame (~60 Hz)
+        self._dirty_nodes: set[str] = set()
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(16)
+        self._update_timer.timeout.connect(self._do_update_connections)
         
         # Current dialogue
         self.dialogue: Optional[Dialogue] = None
@@ -299,11 +452,9 @@ class NodeGraphView(QGraphicsView):
         
         super().mousePressEvent(event)
         
-        item = self.itemAt(event.pos())
-        if isinstance(item, NodeGraphicsItem):
+        item = self._node_at(self.mapToScene(event.pos()))
+        if item:
             self.node_selected.emit(item.node.id)
-        elif isinstance(item, QGraphicsTextItem) and isinstance(item.parentItem(), NodeGraphicsItem):
-            self.node_selected.emit(item.parentItem().node.id)
     
     def mouseMoveEvent(self, event: QMouseEvent):
         """Handle panning."""
@@ -327,11 +478,9 @@ class NodeGraphView(QGraphicsView):
     
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         """Handle double click for editing."""
-        item = self.itemAt(event.pos())
-        if isinstance(item, NodeGraphicsItem):
+        item = self._node_at(self.mapToScene(event.pos()))
+        if item:
             self.node_double_clicked.emit(item.node.id)
-        elif isinstance(item, QGraphicsTextItem) and isinstance(item.parentItem(), NodeGraphicsItem):
-            self.node_double_clicked.emit(item.parentItem().node.id)
         else:
             super().mouseDoubleClickEvent(event)
     
@@ -339,104 +488,279 @@ class NodeGraphView(QGraphicsView):
         """Load a dialogue into the view."""
         self.dialogue = dialogue
         self.clear()
+        self._edges = {node_id: node.outgoing_edges() for node_id, node in dialogue.nodes.items()}
         
-        # Create node items
-        for node_id, node in dialogue.nodes.items():
-            item = NodeGraphicsItem(node)
-            item._graph_view = self  # Set reference for connection updates
-            self.scene.addItem(item)
-            self.node_items[node_id] = item
-        
-        # Create connections
-        self._create_connections()
+        with self._batched_scene_updates():
+            # Create node items
+            for node in dialogue.nodes.values():
+                self._add_node_item(node)
+            
+            # Create connections
+            self._create_connections()
         
-        # Fit to view
-        self.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        # Fit to view once the event loop has processed the new items
+        bbox = self._compute_nodes_bbox()
+        if not bbox.isNull():
+            QTimer.singleShot(0, lambda: self.fitInView(bbox, Qt.AspectRatioMode.KeepAspectRatio))
+    
+    def _compute_nodes_bbox(self) -> QRectF:
+        """Bounding rect of all node items (edges always lie between nodes)."""
+        if not self.node_items:
+            return QRectF()
+        items = iter(self.node_items.values())
+        first = next(items)
+        min_x, min_y = first.x(), first.y()
+        max_x, max_y = min_x + first.rect().width(), min_y + first.rect().height()
+        for item in items:
+            x, y = item.x(), item.y()
+            rect = item.rect()
+            min_x = min(min_x, x)
+            min_y = min(min_y, y)
+            max_x = max(max_x, x + rect.width())
+            max_y = max(max_y, y + rect.height())
+        return QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
+    
+    def _add_node_item(self, node: DialogueNode) -> NodeGraphicsItem:
+        """Create a node item and register it in the scene and lookups."""
+        item = NodeGraphicsItem(node)
+        item._graph_view = self  # Set reference for connection updates
+        self.scene.addItem(item)
+        self.node_items[node.id] = item
+        self.update_spatial_grid(item)
+        return item
+    
+    def _cells_for(self, rect: QRectF) -> list[tuple[int, int]]:
+        """Get the grid cells a scene rect overlaps."""
+        size = self.GRID_CELL_SIZE
+        return [
+            (gx, gy)
+            for gx in range(int(rect.left() // size), int(rect.right() // size) + 1)
+            for gy in range(int(rect.top() // size), int(rect.bottom() // size) + 1)
+        ]
+    
+    def update_spatial_grid(self, item: NodeGraphicsItem):
+        """Re-bucket a node item if it moved into different grid cells."""
+        node_id = item.node.id
+        cells = self._cells_for(item.sceneBoundingRect())
+        old_cells = self._grid_cells.get(node_id)
+        if cells == old_cells:
+            return
+        if old_cells:
+            for cell in old_cells:
+                self._spatial_grid[cell].remove(item)
+        for cell in cells:
+            self._spatial_grid[cell].append(item)
+        self._grid_cells[node_id] = cells
+    
+    def _remove_from_spatial_grid(self, item: NodeGraphicsItem):
+        """Drop a node item from the grid."""
+        for cell in self._grid_cells.pop(item.node.id, ()):
+            self._spatial_grid[cell].remove(item)
+    
+    def _node_at(self, scene_pos: QPointF) -> Optional[NodeGraphicsItem]:
+        """Find the topmost node item under a scene position."""
+        size = self.GRID_CELL_SIZE
+        bucket = self._spatial_grid.get((int(scene_pos.x() // size), int(scene_pos.y() // size)), ())
+        for item in reversed(bucket):
+            if item.sceneBoundingRect().contains(scene_pos):
+                return item
+        return None
+    
+    @contextmanager
+    def _batched_scene_updates(self):
+        """Suspend repaints and scene signals while adding/removing many items."""
+        updates_enabled = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        signals_blocked = self.scene.blockSignals(True)
+        try:
+            yield
+        finally:
+            self.scene.blockSignals(signals_blocked)
+            self.setUpdatesEnabled(updates_enabled)
+            if updates_enabled:
+                self.viewport().update()
     
     def _create_connections(self):
         """Create connection lines between nodes."""
         if not self.dialogue:
             return
         
-        # Clear old connections and their labels
-        for line in self.connection_lines:
-            if line.label:
-                self.scene.removeItem(line.label)
-            self.scene.removeItem(line)
-        self.connection_lines.clear()
-        
-        # Create new connections
-        for node_id, node in self.dialogue.nodes.items():
-            start_item = self.node_items.get(node_id)
-            if not start_item:
-                continue
+        with self._batched_scene_updates():
+            # Clear old connections and their labels
+            for path_item in self._edge_paths.values():
+                self.scene.removeItem(path_item)
+            self._edge_paths.clear()
+            if self._edge_labels:
+                self.scene.removeItem(self._edge_labels)
+                self._edge_labels = None
+            self._conn_items.clear()
+            self._edges_by_node.clear()
             
-            # Direct next
-            if node.next and node.next in self.node_items:
-                end_item = self.node_items[node.next]
-                line = ConnectionLine(start_item, end_item)
-                self.scene.addItem(line)
-                self.connection_lines.append(line)
+            # Create new connections
+            for edges in self._edges.values():
+                for edge in edges:
+                    start_item = self.node_items.get(edge.src)
+                    end_item = self.node_items.get(edge.dst)
+                    if start_item and end_item:
+                        self._add_connection(ConnectionLine(start_item, end_item, edge.choice_index, edge.kind))
             
-            # Choice connections with numbered labels
-            for i, choice in enumerate(node.choices):
-                if choice.next and choice.next in self.node_items:
-                    end_item = self.node_items[choice.next]
-                    line = ConnectionLine(start_item, end_item, choice_index=i)
-                    line.setPen(QPen(QColor("#ff9f4a"), 2))  # Orange for choices
-                    self.scene.addItem(line)
-                    if line.label:
-                        self.scene.addItem(line.label)
-                    self.connection_lines.append(line)
-            
-            # If/then/else
-            if node.then_node and node.then_node in self.node_items:
-                end_item = self.node_items[node.then_node]
-                line = ConnectionLine(start_item, end_item)
-                line.setPen(QPen(QColor("#4aff4a"), 2))  # Green for then
-                self.scene.addItem(line)
-                self.connection_lines.append(line)
-            
-            if node.else_node and node.else_node in self.node_items:
-                end_item = self.node_items[node.else_node]
-                line = ConnectionLine(start_item, end_item)
-                line.setPen(QPen(QColor("#ff4a4a"), 2))  # Red for else
-                self.scene.addItem(line)
-                self.connection_lines.append(line)
-            
-            # Jump
-            if node.jump_target and node.jump_target in self.node_items:
-                end_item = self.node_items[node.jump_target]
-                line = ConnectionLine(start_item, end_item)
-                line.setPen(QPen(QColor("#4aff9f"), 2, Qt.PenStyle.DashLine))
-                self.scene.addItem(line)
-                self.connection_lines.append(line)
+            # One path item per connection kind, one item for all labels
+            for kind, pen in self.EDGE_PENS.items():
+                path_item = QGraphicsPathItem()
+                path_item.setPen(pen)
+                self.scene.addItem(path_item)
+                self._edge_paths[kind] = path_item
+            self._edge_labels = ConnectionLabels()
+            self.scene.addItem(self._edge_labels)
+            self._rebuild_edge_paths()
+    
+    def _edges_update_for(self, node_id: str) -> bool:
+        """Re-derive one node's outgoing edges. Returns True if they changed."""
+        node = self.dialogue.nodes.get(node_id) if self.dialogue else None
+        edges = node.outgoing_edges() if node else []
+        if edges == self._edges.get(node_id, []):
+            return False
+        self._edges[node_id] = edges
+        return True
+    
+    @property
+    def connection_lines(self) -> list[ConnectionLine]:
+        """All connection lines currently shown."""
+        return list(self._conn_items.values())
+    
+    def _add_connection(self, line: ConnectionLine):
+        """Track a connection line and index it by both endpoints."""
+        self._conn_items[line.key] = line
+        self._edges_by_node[line.start_item.node.id].append(line)
+        if line.end_item is not line.start_item:
+            self._edges_by_node[line.end_item.node.id].append(line)
+    
+    def _remove_connection_line(self, line: ConnectionLine):
+        """Forget a connection line and drop it from both endpoint indexes."""
+        del self._conn_items[line.key]
+        for node_id in {line.start_item.node.id, line.end_item.node.id}:
+            lines = self._edges_by_node.get(node_id)
+            if lines:
+                lines.remove(line)
+    
+    def _sync_connections_for(self, src_id: str, dst_id: Optional[str] = None) -> set[str]:
+        """Match the lines leaving a node (optionally only those to dst_id) to its edges.
+        
+        Returns the connection kinds whose paths need rebuilding.
+        """
+        start_item = self.node_items.get(src_id)
+        wanted = {}
+        if start_item:
+            for edge in self._edges.get(src_id, ()):
+                if dst_id is not None and edge.dst != dst_id:
+                    continue
+                if edge.dst in self.node_items:
+                    wanted[(src_id, edge.dst, edge.kind, edge.choice_index)] = edge
+        
+        kinds = set()
+        for line in list(self._edges_by_node.get(src_id, ())):
+            if line.start_item is start_item and (dst_id is None or line.key[1] == dst_id):
+                if line.key in wanted:
+                    del wanted[line.key]  # Already shown
+                else:
+                    self._remove_connection_line(line)
+                    kinds.add(line.kind)
+        for (_, dst, kind, choice_index) in wanted:
+            self._add_connection(ConnectionLine(start_item, self.node_items[dst], choice_index, kind))
+            kinds.add(kind)
+        return kinds
+    
+    def add_connection(self, src_id: str, dst_id: str):
+        """Add the lines from one node to another without rebuilding the others."""
+        self._edges_update_for(src_id)
+        kinds = self._sync_connections_for(src_id, dst_id)
+        if kinds:
+            self._rebuild_edge_paths(kinds)
+    
+    def remove_connection(self, src_id: str, dst_id: str):
+        """Drop the lines from one node to another that its edges no longer have."""
+        self.add_connection(src_id, dst_id)  # Same diff: stale lines go, missing ones come
+    
+    def _rebuild_edge_paths(self, kinds: Optional[set[str]] = None):
+        """Rebuild the batched path of each given connection kind (all by default)."""
+        if kinds is None:
+            kinds = set(self.EDGE_PENS)
+        paths = {kind: QPainterPath() for kind in kinds}
+        for line in self._conn_items.values():
+            path = paths.get(line.kind)
+            if path is not None:
+                path.moveTo(line.start)
+                path.lineTo(line.end)
+        for kind, path in paths.items():
+            if kind in self._edge_paths:
+                self._edge_paths[kind].setPath(path)
+        if "choice" in kinds and self._edge_labels:
+            self._edge_labels.set_lines(self._conn_items.values())
     
     def clear(self):
         """Clear the view."""
         self.scene.clear()
         self.node_items.clear()
-        self.connection_lines.clear()
+        self._edges.clear()
+        self._conn_items.clear()
+        self._edges_by_node.clear()
+        self._edge_paths.clear()
+        self._edge_labels = None
+        self._spatial_grid.clear()
+        self._grid_cells.clear()
+        self._dirty_nodes.clear()
     
     def refresh_node(self, node_id: str):
         """Refresh a single node's display."""
-        if node_id in self.node_items:
-            self.node_items[node_id].update_display()
-        self._create_connections()
+        item = self.node_items.get(node_id)
+        resized = item.update_display() if item else False
+        if resized:
+            self.update_spatial_grid(item)
+        kinds = self._sync_connections_for(node_id) if self._edges_update_for(node_id) else set()
+        if resized or kinds or (item and item.node.choices):
+            # Ports may have moved (height, or choice outputs spread by choice count)
+            for line in self._edges_by_node.get(node_id, ()):
+                line.update_position()
+                kinds.add(line.kind)
+        if kinds:
+            self._rebuild_edge_paths(kinds)
     
     def add_node(self, node: DialogueNode, x: float = 0, y: float = 0):
         """Add a new node to the view."""
         node.ui_pos.x = x
         node.ui_pos.y = y
-        item = NodeGraphicsItem(node)
-        item._graph_view = self  # Set reference for connection updates
-        self.scene.addItem(item)
-        self.node_items[node.id] = item
+        self._add_node_item(node)
+        self._edges[node.id] = node.outgoing_edges()
+        self.node_added.emit(node.id)
     
     def update_connections(self):
-        """Update connection line positions (called during node drag)."""
-        for line in self.connection_lines:
+        """Update all connection line positions."""
+        for line in self._conn_items.values():
             line.update_position()
+        self._rebuild_edge_paths()
+    
+    def update_connections_for(self, node_id: str):
+        """Update only the lines attached to one node."""
+        lines = self._edges_by_node.get(node_id, ())
+        for line in lines:
+            line.update_position()
+        self._rebuild_edge_paths({line.kind for line in lines})
+    
+    def schedule_connections_update(self, node_id: str):
+        """Queue a node's lines for update on the next frame (called during node drag)."""
+        self._dirty_nodes.add(node_id)
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+    
+    def _do_update_connections(self):
+        """Flush queued connection updates, touching each line once."""
+        lines = set()
+        for node_id in self._dirty_nodes:
+            lines.update(self._edges_by_node.get(node_id, ()))
+        self._dirty_nodes.clear()
+        for line in lines:
+            line.update_position()
+        self._rebuild_edge_paths({line.kind for line in lines})
     
     def remove_node(self, node_id: str):
         """Remove a node from the view."""
@@ -444,7 +768,18 @@ class NodeGraphView(QGraphicsView):
             item = self.node_items[node_id]
             self.scene.removeItem(item)
             del self.node_items[node_id]
-            self._create_connections()
+            self._remove_from_spatial_grid(item)
+            
+            # Drop its lines; the model already cleared references to it, so
+            # re-derive the sources of the incoming ones
+            lines = self._edges_by_node.pop(node_id, [])
+            for line in lines:
+                self._remove_connection_line(line)
+                if line.start_item is not item:
+                    self._edges_update_for(line.start_item.node.id)
+            self._edges.pop(node_id, None)
+            self._rebuild_edge_paths({line.kind for line in lines})
+            self.node_removed.emit(node_id)
     
     def get_selected_node_id(self) -> Optional[str]:
         """Get the currently selected node ID."""
@@ -467,6 +802,7 @@ class CharacterPanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.dialogue: Optional[Dialogue] = None
+        self._items_by_id: dict[str, QListWidgetItem] = {}
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -504,19 +840,37 @@ class CharacterPanel(QWidget):
     def set_dialogue(self, dialogue: Dialogue):
         """Set the current dialogue."""
         self.dialogue = dialogue
-        self._refresh_list()
-    
-    def _refresh_list(self):
-        """Refresh the character list."""
-        self.char_list.clear()
-        if not self.dialogue:
-            return
-        
-        for char_id, char in self.dialogue.characters.items():
-            display_name = f"{char_id}: {char.name}" if char.name != char_id else char_id
-            item = QListWidgetItem(display_name)
-            item.setData(Qt.ItemDataRole.UserRole, char_id)
-            self.char_list.addItem(item)
+        self._full_refresh()
+    
+    @staticmethod
+    def _display_name(char: Character) -> str:
+        """Get the list text for a character."""
+        return f"{char.id}: {char.name}" if char.name != char.id else char.id
+    
+    def _full_refresh(self):
+        """Rebuild the whole character list (on dialogue change)."""
+        # clear() and addItem() would fire itemSelectionChanged per row
+        with QSignalBlocker(self.char_list):
+            self.char_list.clear()
+            self._items_by_id.clear()
+            if not self.dialogue:
+                return
+            
+            for char in self.dialogue.characters.values():
+                self._append_item(char)
+    
+    def _append_item(self, char: Character):
+        """Add a list row for one character."""
+        item = QListWidgetItem(self._display_name(char))
+        item.setData(Qt.ItemDataRole.UserRole, char.id)
+        self.char_list.addItem(item)
+        self._items_by_id[char.id] = item
+    
+    def _update_item(self, char_id: str):
+        """Update the text of one character's row in place."""
+        item = self._items_by_id.get(char_id)
+        if item and self.dialogue and char_id in self.dialogue.characters:
+            item.setText(self._display_name(self.dialogue.characters[char_id]))
     
     def _on_selection_changed(self):
         """Handle selection change."""
@@ -545,7 +899,7 @@ class CharacterPanel(QWidget):
         self.dialogue.characters[char_id] = character
         self.dialogue.is_modified = True
         
-        self._refresh_list()
+        self._append_item(character)
         self.characters_changed.emit()
     
     def _edit_character(self, item: Optional[QListWidgetItem] = None):
@@ -572,7 +926,7 @@ class CharacterPanel(QWidget):
         if ok:
             char.name = name or char_id
             self.dialogue.is_modified = True
-            self._refresh_list()
+            self._update_item(char_id)
             self.characters_changed.emit()
     
     def _remove_character(self):
@@ -595,7 +949,7 @@ class CharacterPanel(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             del self.dialogue.characters[char_id]
             self.dialogue.is_modified = True
-            self._refresh_list()
+            self.char_list.takeItem(self.char_list.row(self._items_by_id.pop(char_id)))
             self.characters_changed.emit()
 
 
@@ -603,16 +957,73 @@ class CharacterPanel(QWidget):
 # INSPECTOR PANEL
 # ============================================================================
 
+class ChoicesModel(QAbstractListModel):
+    """List model over a node's choices; row text is formatted on demand."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._choices: list[ChoiceOption] = []
+    
+    def set_choices(self, choices: list[ChoiceOption]):
+        """Show another node's choice list (shared, not copied)."""
+        self.beginResetModel()
+        self._choices = choices
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._choices)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        choice = self._choices[index.row()]
+        target = f" → {choice.next}" if choice.next else " → ?"
+        return f"{index.row() + 1}. {choice.text}{target}"
+    
+    def append_choice(self, choice: ChoiceOption):
+        """Append a choice to the list and the view."""
+        row = len(self._choices)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._choices.append(choice)
+        self.endInsertRows()
+    
+    def remove_choice(self, row: int) -> ChoiceOption:
+        """Remove a choice, renumbering the rows after it."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        choice = self._choices.pop(row)
+        self.endRemoveRows()
+        if row < len(self._choices):
+            self.dataChanged.emit(self.index(row), self.index(len(self._choices) - 1))
+        return choice
+    
+    def choice_changed(self, row: int):
+        """Repaint one row after its choice was edited."""
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+
 class NodeInspector(QWidget):
     """Inspector panel for editing node properties."""
     
     node_changed = Signal(str)  # node_id
     
+    # type_combo row for each node type (rows are added in NodeType order)
+    _NODE_TYPE_INDEX = {nt: i for i, nt in enumerate(NodeType)}
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.dialogue: Optional[Dialogue] = None
         self.current_node: Optional[DialogueNode] = None
         
+        # Field edits are applied at once, node_changed is coalesced per keystroke burst
+        self._pending_node_id: Optional[str] = None
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(100)
+        self._emit_timer.timeout.connect(self._flush_node_changed)
+        self._choice_visible = False
+        self._main_window: Optional[QMainWindow] = None
+        
         layout = QVBoxLayout(self)
         
         # Node info
@@ -637,6 +1048,10 @@ class NodeInspector(QWidget):
         
         self.speaker_combo = QComboBox()
         self.speaker_combo.setEditable(True)
+        self.speaker_combo.view().setUniformItemSizes(True)
+        self._speaker_model = QStringListModel(self)
+        self._speaker_items: list[str] = []
+        self.speaker_combo.setModel(self._speaker_model)
         self.speaker_combo.currentTextChanged.connect(self._on_field_changed)
         self.speaker_combo.activated.connect(self._on_speaker_selected)
         say_layout.addRow("Speaker:", self.speaker_combo)
@@ -652,9 +1067,12 @@ class NodeInspector(QWidget):
         self.choice_group = QGroupBox("Choices (double-click to edit)")
         choice_layout = QVBoxLayout(self.choice_group)
         
-        self.choices_list = QListWidget()
-        self.choices_list.itemDoubleClicked.connect(self._edit_choice)
-        self.choices_list.itemSelectionChanged.connect(self._on_choice_selection_changed)
+        self._choices_model = ChoicesModel(self)
+        self.choices_list = QListView()
+        self.choices_list.setUniformItemSizes(True)
+        self.choices_list.setModel(self._choices_model)
+        self.choices_list.doubleClicked.connect(self._edit_choice)
+        self.choices_list.selectionModel().currentChanged.connect(self._on_choice_selection_changed)
         choice_layout.addWidget(self.choices_list)
         
         choice_buttons = QHBoxLayout()
@@ -685,6 +1103,16 @@ class NodeInspector(QWidget):
         
         self.next_combo = QComboBox()
         self.next_combo.setEditable(True)
+        # Virtualized popup: only visible rows are laid out, even with thousands of nodes
+        next_view = QListView()
+        next_view.setUniformItemSizes(True)
+        next_view.setLayoutMode(QListView.LayoutMode.Batched)
+        next_view.setBatchSize(100)
+        self.next_combo.setView(next_view)
+        self.next_combo.setStyleSheet("QComboBox { combobox-popup: 0; }")
+        self._next_model = QStringListModel(self)
+        self._next_items: list[str] = []
+        self.next_combo.setModel(self._next_model)
         self.next_combo.currentTextChanged.connect(self._on_field_changed)
         next_layout.addRow("Next:", self.next_combo)
         
@@ -697,34 +1125,30 @@ class NodeInspector(QWidget):
     
     def set_dialogue(self, dialogue: Dialogue):
         """Set the current dialogue for character list."""
+        self._flush_node_changed()
         self.dialogue = dialogue
         self._update_speaker_list()
         self._update_node_list()
     
     def load_node(self, node: DialogueNode):
         """Load a node for editing."""
+        self._flush_node_changed()
         self.current_node = node
         
-        # Block signals during load
-        self.type_combo.blockSignals(True)
-        self.speaker_combo.blockSignals(True)
-        self.text_edit.blockSignals(True)
-        self.next_combo.blockSignals(True)
-        
-        self.id_edit.setText(node.id)
-        self.type_combo.setCurrentIndex(list(NodeType).index(node.type))
-        self.speaker_combo.setCurrentText(node.speaker)
-        self.text_edit.setPlainText(node.text)
-        self.next_combo.setCurrentText(node.next)
-        
-        # Load choices
-        self._refresh_choices_list()
-        
-        # Unblock signals
-        self.type_combo.blockSignals(False)
-        self.speaker_combo.blockSignals(False)
-        self.text_edit.blockSignals(False)
-        self.next_combo.blockSignals(False)
+        # Block signals during load (restored even if loading raises)
+        with (QSignalBlocker(self.type_combo), QSignalBlocker(self.speaker_combo),
+              QSignalBlocker(self.text_edit), QSignalBlocker(self.next_combo)):
+            self.id_edit.setText(node.id)
+            self.type_combo.setCurrentIndex(self._NODE_TYPE_INDEX[node.type])
+            self.speaker_combo.setCurrentText(node.speaker)
+            self.text_edit.setPlainText(node.text)
+            self.next_combo.setCurrentText(node.next)
+            
+            # Load choices (if the group is hidden, _update_visibility fills it on show)
+            if node.type != NodeType.CHOICE:
+                self._choices_model.set_choices([])
+            elif self._choice_visible:
+                self._refresh_choices_list()
         
         self._update_visibility()
     
@@ -733,37 +1157,80 @@ class NodeInspector(QWidget):
         if not self.current_node:
             self.say_group.hide()
             self.choice_group.hide()
+            self._choice_visible = False
             return
         
         node_type = self.current_node.type
+        choice_visible = node_type == NodeType.CHOICE
         self.say_group.setVisible(node_type == NodeType.SAY)
-        self.choice_group.setVisible(node_type == NodeType.CHOICE)
+        self.choice_group.setVisible(choice_visible)
+        if choice_visible and not self._choice_visible:
+            self._refresh_choices_list()
+        self._choice_visible = choice_visible
         
         # Update choice button states
         if node_type == NodeType.CHOICE:
             self._on_choice_selection_changed()
     
+    @staticmethod
+    def _set_combo_strings(combo: QComboBox, model: QStringListModel, items: list[str]):
+        """Swap a combo's backing model in one reset, keeping the current text."""
+        current = combo.currentText()
+        with QSignalBlocker(combo):
+            model.setStringList(items)
+            combo.setCurrentText(current)
+    
     def _update_speaker_list(self):
         """Update speaker dropdown with characters."""
-        self.speaker_combo.clear()
-        self.speaker_combo.addItem("")
+        items = [""]
         if self.dialogue:
-            for char_id in self.dialogue.characters:
-                self.speaker_combo.addItem(char_id)
+            items.extend(self.dialogue.characters)
+        if items != self._speaker_items:
+            self._speaker_items = items
+            self._set_combo_strings(self.speaker_combo, self._speaker_model, items)
     
     def _update_node_list(self):
         """Update next node dropdown."""
-        self.next_combo.clear()
-        self.next_combo.addItem("")
+        items = [""]
         if self.dialogue:
-            for node_id in self.dialogue.nodes:
-                self.next_combo.addItem(str(node_id))
+            items.extend(self.dialogue.nodes)
+        if items != self._next_items:
+            self._next_items = items
+            self._set_combo_strings(self.next_combo, self._next_model, items)
+    
+    def add_node_item(self, node_id: str):
+        """Append one node ID to the next dropdown."""
+        row = len(self._next_items)
+        self._next_items.append(node_id)
+        self._next_model.insertRow(row)
+        self._next_model.setData(self._next_model.index(row), node_id)
+    
+    def remove_node_item(self, node_id: str):
+        """Drop one node ID from the next dropdown."""
+        if node_id not in self._next_items:
+            return
+        row = self._next_items.index(node_id)
+        del self._next_items[row]
+        current = self.next_combo.currentText()
+        with QSignalBlocker(self.next_combo):
+            self._next_model.removeRow(row)
+            self.next_combo.setCurrentText(current)
+    
+    def rename_node_item(self, old_id: str, new_id: str):
+        """Rename one node ID in the next dropdown in place."""
+        if old_id not in self._next_items:
+            return
+        row = self._next_items.index(old_id)
+        self._next_items[row] = new_id
+        self._next_model.setData(self._next_model.index(row), new_id)
     
     def _on_type_changed(self):
         """Handle type change."""
         if not self.current_node:
             return
         self.current_node.type = self.type_combo.currentData()
+        if self.dialogue:
+            self.dialogue.revision += 1
         self._update_visibility()
         self.node_changed.emit(self.current_node.id)
     
@@ -772,14 +1239,30 @@ class NodeInspector(QWidget):
         if not self.current_node:
             return
         
-        self.current_node.speaker = self.speaker_combo.currentText()
-        self.current_node.text = self.text_edit.toPlainText()
-        self.current_node.next = self.next_combo.currentText()
+        node = self.current_node
+        new_speaker = self.speaker_combo.currentText()
+        new_text = self.text_edit.toPlainText()
+        new_next = self.next_combo.currentText()
+        if (node.speaker, node.text, node.next) == (new_speaker, new_text, new_next):
+            return
+        
+        old_next = node.next
+        node.speaker, node.text, node.next = new_speaker, new_text, new_next
         
         if self.dialogue:
+            self.dialogue.retarget_incoming(old_next, new_next, node.id)
             self.dialogue.is_modified = True
+            self.dialogue.revision += 1
         
-        self.node_changed.emit(self.current_node.id)
+        self._pending_node_id = node.id
+        self._emit_timer.start()
+    
+    def _flush_node_changed(self):
+        """Emit a pending node_changed from field edits right away."""
+        self._emit_timer.stop()
+        if self._pending_node_id is not None:
+            node_id, self._pending_node_id = self._pending_node_id, None
+            self.node_changed.emit(node_id)
     
     def _on_speaker_selected(self, index: int):
         """Handle speaker selection from dropdown - close popup and focus text."""
@@ -788,12 +1271,11 @@ class NodeInspector(QWidget):
     
     def _refresh_choices_list(self):
         """Refresh the choices list display."""
-        self.choices_list.clear()
-        if not self.current_node:
-            return
-        for i, choice in enumerate(self.current_node.choices, 1):
-            target = f" → {choice.next}" if choice.next else " → ?"
-            self.choices_list.addItem(f"{i}. {choice.text}{target}")
+        self._choices_model.set_choices(self.current_node.choices if self.current_node else [])
+    
+    def _current_choice_row(self) -> int:
+        """Get the selected choice row, or -1."""
+        return self.choices_list.currentIndex().row()
     
     def _add_choice(self):
         """Add a new choice."""
@@ -803,8 +1285,7 @@ class NodeInspector(QWidget):
         text, ok = QInputDialog.getText(self, "Add Choice", "Choice text:")
         if ok and text:
             choice = ChoiceOption(text=text)
-            self.current_node.choices.append(choice)
-            self._refresh_choices_list()
+            self._choices_model.append_choice(choice)
             if self.dialogue:
                 self.dialogue.is_modified = True
             self.node_changed.emit(self.current_node.id)
@@ -818,7 +1299,7 @@ class NodeInspector(QWidget):
         if not self.current_node:
             return
         
-        row = self.choices_list.currentRow()
+        row = self._current_choice_row()
         if row < 0 or row >= len(self.current_node.choices):
             return
         
@@ -829,14 +1310,14 @@ class NodeInspector(QWidget):
         )
         if ok and text:
             choice.text = text
-            self._refresh_choices_list()
+            self._choices_model.choice_changed(row)
             if self.dialogue:
                 self.dialogue.is_modified = True
             self.node_changed.emit(self.current_node.id)
     
     def _on_choice_selection_changed(self):
         """Update button states based on choice selection."""
-        row = self.choices_list.currentRow()
+        row = self._current_choice_row()
         has_selection = row >= 0 and self.current_node and row < len(self.current_node.choices)
         
         if has_selection:
@@ -849,32 +1330,18 @@ class NodeInspector(QWidget):
         else:
             self.new_node_btn.setEnabled(False)
     
-    def _get_nodes_with_incoming(self) -> set:
-        """Get set of node IDs that have incoming connections."""
+    def _get_nodes_with_incoming(self):
+        """Get node IDs that have incoming connections."""
         if not self.dialogue:
             return set()
-        
-        incoming = set()
-        for node in self.dialogue.nodes.values():
-            if node.next:
-                incoming.add(node.next)
-            for choice in node.choices:
-                if choice.next:
-                    incoming.add(choice.next)
-            if node.then_node:
-                incoming.add(node.then_node)
-            if node.else_node:
-                incoming.add(node.else_node)
-            if node.jump_target:
-                incoming.add(node.jump_target)
-        return incoming
+        return self.dialogue.incoming_node_ids()
     
     def _link_choice(self):
         """Link selected choice to a target node."""
         if not self.current_node or not self.dialogue:
             return
         
-        row = self.choices_list.currentRow()
+        row = self._current_choice_row()
         if row < 0 or row >= len(self.current_node.choices):
             QMessageBox.warning(self, "No Selection", "Select a choice first")
             return
@@ -885,11 +1352,14 @@ class NodeInspector(QWidget):
         nodes_with_incoming = self._get_nodes_with_incoming()
         
         # Build node list - orphans first, then option to show all
-        # Convert to strings in case YAML parsed them as ints
-        orphan_nodes = [str(nid) for nid in self.dialogue.nodes.keys() 
-                       if nid not in nodes_with_incoming and nid != self.current_node.id]
-        all_other_nodes = [str(nid) for nid in self.dialogue.nodes.keys() 
-                          if nid != self.current_node.id and str(nid) not in orphan_nodes]
+        # (node IDs are already strings, the loader normalizes them)
+        current_id = self.current_node.id
+        orphan_nodes = [nid for nid in self.dialogue.nodes
+                        if nid not in nodes_with_incoming and nid != current_id]
+        orphan_set = set(orphan_nodes)
+        all_other_nodes = [nid for nid in self.dialogue.nodes
+                           if nid != current_id and nid not in orphan_set]
+        all_other_labels = [f"● {nid}" for nid in all_other_nodes]
         
         # Create dialog with checkbox
         from PySide6.QtWidgets import QDialog, QVBoxLayout, QCheckBox, QDialogButtonBox
@@ -903,37 +1373,40 @@ class NodeInspector(QWidget):
         show_all_cb = QCheckBox("Show all nodes (including already connected)")
         layout.addWidget(show_all_cb)
         
+        # Node ID per combo row (None for the separator), filled with addItems
+        combo_ids = []
         node_combo = QComboBox()
-        node_combo.addItem("(none)", "")
-        for nid in orphan_nodes:
-            node_combo.addItem(nid, nid)
+        
+        def combo_index(nid: str) -> int:
+            return combo_ids.index(nid) if nid in combo_ids else -1
         
         def update_combo():
-            current = node_combo.currentData()
+            current = combo_ids[node_combo.currentIndex()] if combo_ids else ""
             node_combo.clear()
-            node_combo.addItem("(none)", "")
-            for nid in orphan_nodes:
-                node_combo.addItem(nid, nid)
+            node_combo.addItems(["(none)"] + orphan_nodes)
+            combo_ids[:] = [""] + orphan_nodes
             if show_all_cb.isChecked():
                 if orphan_nodes and all_other_nodes:
                     node_combo.insertSeparator(len(orphan_nodes) + 1)
-                for nid in all_other_nodes:
-                    node_combo.addItem(f"● {nid}", nid)
+                    combo_ids.append(None)
+                node_combo.addItems(all_other_labels)
+                combo_ids.extend(all_other_nodes)
             # Restore selection
-            idx = node_combo.findData(current)
+            idx = combo_index(current)
             if idx >= 0:
                 node_combo.setCurrentIndex(idx)
         
+        update_combo()
         show_all_cb.toggled.connect(update_combo)
         layout.addWidget(node_combo)
         
         # Set current value
         if choice.next:
-            idx = node_combo.findData(choice.next)
+            idx = combo_index(choice.next)
             if idx < 0:
                 # Not in orphans, need to show all
                 show_all_cb.setChecked(True)
-                idx = node_combo.findData(choice.next)
+                idx = combo_index(choice.next)
             if idx >= 0:
                 node_combo.setCurrentIndex(idx)
         
@@ -943,10 +1416,12 @@ class NodeInspector(QWidget):
         layout.addWidget(buttons)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            choice.next = node_combo.currentData() or ""
-            self._refresh_choices_list()
+            old_next = choice.next
+            choice.next = combo_ids[node_combo.currentIndex()] or ""
+            self._choices_model.choice_changed(row)
             self._on_choice_selection_changed()
             if self.dialogue:
+                self.dialogue.retarget_incoming(old_next, choice.next, self.current_node.id)
                 self.dialogue.is_modified = True
             self.node_changed.emit(self.current_node.id)
     
@@ -955,7 +1430,7 @@ class NodeInspector(QWidget):
         if not self.current_node or not self.dialogue:
             return
         
-        row = self.choices_list.currentRow()
+        row = self._current_choice_row()
         if row < 0 or row >= len(self.current_node.choices):
             return
         
@@ -976,36 +1451,40 @@ class NodeInspector(QWidget):
         
         # Link choice to new node
         choice.next = new_node.id
+        self.dialogue.retarget_incoming("", new_node.id, self.current_node.id)
         
         # Add to dialogue
         self.dialogue.add_node(new_node)
         self.dialogue.is_modified = True
         
-        # Refresh UI
-        self._refresh_choices_list()
-        self._on_choice_selection_changed()
-        self.node_changed.emit(self.current_node.id)
-        
-        # Notify parent window to add the node to graph
+        # Notify parent window to add the node and its link to the graph
         # This is a bit hacky but works
-        parent = self.parent()
-        while parent and not isinstance(parent, QMainWindow):
-            parent = parent.parent()
+        if self._main_window is None:
+            parent = self.parent()
+            while parent and not isinstance(parent, QMainWindow):
+                parent = parent.parent()
+            self._main_window = parent
+        parent = self._main_window
         if parent and hasattr(parent, 'graph_view'):
             parent.graph_view.add_node(new_node, new_node.ui_pos.x, new_node.ui_pos.y)
-            parent.graph_view._create_connections()
-            parent.inspector._update_node_list()
+            parent.graph_view.add_connection(self.current_node.id, new_node.id)
+            # graph_view.node_added appends the new ID to the next combo
+        
+        # Refresh UI
+        self._choices_model.choice_changed(row)
+        self._on_choice_selection_changed()
+        self.node_changed.emit(self.current_node.id)
     
     def _remove_choice(self):
         """Remove selected choice."""
         if not self.current_node:
             return
         
-        row = self.choices_list.currentRow()
+        row = self._current_choice_row()
         if row >= 0 and row < len(self.current_node.choices):
-            del self.current_node.choices[row]
-            self._refresh_choices_list()
+            removed = self._choices_model.remove_choice(row)
             if self.dialogue:
+                self.dialogue.retarget_incoming(removed.next, "")
                 self.dialogue.is_modified = True
             self.node_changed.emit(self.current_node.id)
 
@@ -1014,23 +1493,135 @@ class NodeInspector(QWidget):
 # MAIN WINDOW
 # ============================================================================
 
+class DialogueListModel(QAbstractListModel):
+    """Flat list model over a project's dialogues for the dialogue browser."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._project: Optional[Project] = None
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}  # dialogue_id -> row
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        dialogue_id = self._ids[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return dialogue_id
+        if role == Qt.ItemDataRole.DisplayRole:
+            title = self._project.dialogue_title(dialogue_id)
+            dialogue = self._project.dialogues.get(dialogue_id)
+            return f"* {title}" if dialogue and dialogue.is_modified else title
+        return None
+    
+    def sync(self, project: Optional[Project]):
+        """Match the rows to the project's dialogues, keeping surviving rows."""
+        if project is not self._project:
+            self.beginResetModel()
+            self._project = project
+            self._ids = project.dialogue_ids() if project else []
+            self._rows = {dialogue_id: row for row, dialogue_id in enumerate(self._ids)}
+            self.endResetModel()
+            return
+        if not project:
+            return
+        
+        dialogues = project.dialogue_ids()
+        listed = set(dialogues)
+        for row in reversed(range(len(self._ids))):
+            if self._ids[row] not in listed:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._ids[row]
+                self.endRemoveRows()
+        new_ids = [dialogue_id for dialogue_id in dialogues if dialogue_id not in self._rows]
+        self._rows = {dialogue_id: row for row, dialogue_id in enumerate(self._ids)}
+        if new_ids:
+            first = len(self._ids)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_ids) - 1)
+            self._ids.extend(new_ids)
+            self._rows.update((dialogue_id, first + i) for i, dialogue_id in enumerate(new_ids))
+            self.endInsertRows()
+        if self._ids:
+            # Titles and modified markers may have changed; views repaint visible rows only
+            self.dataChanged.emit(self.index(0), self.index(len(self._ids) - 1),
+                                  [Qt.ItemDataRole.DisplayRole])
+    
+    def dialogue_changed(self, dialogue_id: str):
+        """Repaint the row of one dialogue."""
+        row = self._rows.get(dialogue_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+
+
+class _SaveSignals(QObject):
+    """Signals of a _SaveTask (QRunnable can't emit itself)."""
+    
+    finished = Signal(object, str)  # task, error message ("" on success)
+
+
+class _SaveTask(QRunnable):
+    """Write one dialogue on a thread pool worker.
+    
+    The dialogue is snapshotted on the GUI thread; the worker only dumps the
+    snapshot and never touches the live Dialogue.
+    """
+    
+    def __init__(self, dialogue: Dialogue):
+        super().__init__()
+        self.dialogue = dialogue
+        self.path = dialogue.file_path
+        self.edit_count = dialogue.edit_count
+        self.data = DialogueYAMLSaver._dialogue_to_dict(dialogue)
+        self.signals = _SaveSignals()
+    
+    def run(self):
+        try:
+            DialogueYAMLSaver.write_dict(self.data, self.path)
+            error = ""
+        except Exception as e:
+            error = str(e)
+        self.signals.finished.emit(self, error)
+
+
 class DialogueEditorWindow(QMainWindow):
     """Main window for the Dialogue Editor."""
     
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Dialogue Editor")
+        self.setWindowTitle("Dialogue Editor[*]")
         self.setMinimumSize(1200, 800)
         
         self.project: Optional[Project] = None
         self.current_dialogue: Optional[Dialogue] = None
         self._last_active_node_id: Optional[str] = None
+        self._speaker_history_cache: Optional[tuple[Dialogue, int, list[str]]] = None
+        self._current_speaker_cache: Optional[tuple[Dialogue, tuple, str]] = None
+        
+        # Tree "*" markers are refreshed at most every 100 ms while editing
+        self._dirty_dialogue_ids: set[str] = set()
+        self._dirty_timer = QTimer(self)
+        self._dirty_timer.setSingleShot(True)
+        self._dirty_timer.setInterval(100)
+        self._dirty_timer.timeout.connect(self._flush_dirty_dialogues)
+        
+        # Set while Save All waits for its workers, so it can't start twice
+        self._saving_all = False
         
         self._setup_ui()
-        self._setup_menu()
-        self._setup_toolbar()
         self._setup_statusbar()
         self._setup_shortcuts()
+        
+        # Menus and toolbar are built after the first paint
+        QTimer.singleShot(0, self._deferred_setup)
+    
+    def _deferred_setup(self):
+        """Build the menu bar and toolbar once the event loop is running."""
+        self._setup_menu()
+        self._setup_toolbar()
     
     def _setup_ui(self):
         """Setup the main UI layout."""
@@ -1046,9 +1637,13 @@ class DialogueEditorWindow(QMainWindow):
         # Dialogues section
         left_layout.addWidget(QLabel("Dialogues"))
         
-        self.dialogue_tree = QTreeWidget()
+        self._dialogue_model = DialogueListModel(self)
+        self.dialogue_tree = QTreeView()
+        self.dialogue_tree.setModel(self._dialogue_model)
         self.dialogue_tree.setHeaderHidden(True)
-        self.dialogue_tree.itemClicked.connect(self._on_dialogue_selected)
+        self.dialogue_tree.setRootIsDecorated(False)
+        self.dialogue_tree.setUniformRowHeights(True)
+        self.dialogue_tree.clicked.connect(self._on_dialogue_selected)
         left_layout.addWidget(self.dialogue_tree)
         
         # Dialogue buttons
@@ -1084,6 +1679,8 @@ class DialogueEditorWindow(QMainWindow):
         
         self.inspector = NodeInspector()
         self.inspector.node_changed.connect(self._on_node_changed)
+        self.graph_view.node_added.connect(self.inspector.add_node_item)
+        self.graph_view.node_removed.connect(self.inspector.remove_node_item)
         right_layout.addWidget(self.inspector)
         
         splitter.addWidget(right_panel)
@@ -1144,12 +1741,12 @@ class DialogueEditorWindow(QMainWindow):
         
         add_choice_action = QAction("Add CHOICE Node", self)
         add_choice_action.setShortcut("Ctrl+B")
-        add_choice_action.triggered.connect(lambda: self._add_node(NodeType.CHOICE))
+        add_choice_action.triggered.connect(self._add_choice_node)
         edit_menu.addAction(add_choice_action)
         
         add_end_action = QAction("Add END Node", self)
         add_end_action.setShortcut("Ctrl+E")
-        add_end_action.triggered.connect(lambda: self._add_node(NodeType.END))
+        add_end_action.triggered.connect(self._add_end_node)
         edit_menu.addAction(add_end_action)
         
         edit_menu.addSeparator()
@@ -1193,10 +1790,10 @@ class DialogueEditorWindow(QMainWindow):
         
         toolbar.addSeparator()
         
-        choice_action = toolbar.addAction("+ Choice (Ctrl+B)", lambda: self._add_node(NodeType.CHOICE))
+        choice_action = toolbar.addAction("+ Choice (Ctrl+B)", self._add_choice_node)
         choice_action.setToolTip("Add CHOICE node with branching options")
         
-        end_action = toolbar.addAction("+ End (Ctrl+E)", lambda: self._add_node(NodeType.END))
+        end_action = toolbar.addAction("+ End (Ctrl+E)", self._add_end_node)
         end_action.setToolTip("Add END node to finish dialogue")
         
         toolbar.addSeparator()
@@ -1218,35 +1815,38 @@ class DialogueEditorWindow(QMainWindow):
         if not self.current_dialogue:
             return ""
         
+        # Reuse the last answer while the selection and dialogue are unchanged
+        selected_id = self.graph_view.get_selected_node_id()
+        key = (selected_id, self._last_active_node_id, self.current_dialogue.revision)
+        cache = self._current_speaker_cache
+        if cache and cache[0] is self.current_dialogue and cache[1] == key:
+            return cache[2]
+        
         # Try selected node first, then last active
-        node_id = self.graph_view.get_selected_node_id() or self._last_active_node_id
-        if node_id and node_id in self.current_dialogue.nodes:
-            node = self.current_dialogue.nodes[node_id]
-            if node.type == NodeType.SAY:
-                return node.speaker
+        speaker = ""
+        node_id = selected_id or self._last_active_node_id
+        node = self.current_dialogue.nodes.get(node_id) if node_id else None
+        if node and node.type == NodeType.SAY:
+            speaker = node.speaker
         
-        return ""
+        self._current_speaker_cache = (self.current_dialogue, key, speaker)
+        return speaker
     
     def _get_speaker_history(self) -> list[str]:
         """Get list of speakers in chronological order (by node chain from start)."""
         if not self.current_dialogue:
             return []
         
-        speakers = []
-        visited = set()
-        
-        # Walk from start node
-        current = self.current_dialogue.start
-        while current and current not in visited:
-            visited.add(current)
-            if current in self.current_dialogue.nodes:
-                node = self.current_dialogue.nodes[current]
-                if node.type == NodeType.SAY and node.speaker:
-                    speakers.append(node.speaker)
-                current = node.next
-            else:
-                break
+        # Reuse the last walk while the dialogue hasn't changed
+        cache = self._speaker_history_cache
+        if cache and cache[0] is self.current_dialogue and cache[1] == self.current_dialogue.revision:
+            return cache[2]
         
+        speakers = [
+            node.speaker for node in self.current_dialogue.ordered_chain()
+            if node.type == NodeType.SAY and node.speaker
+        ]
+        self._speaker_history_cache = (self.current_dialogue, self.current_dialogue.revision, speakers)
         return speakers
     
     def _get_other_speaker(self) -> str:
@@ -1260,7 +1860,7 @@ class DialogueEditorWindow(QMainWindow):
             return ""
         
         current_speaker = self._get_current_speaker()
-        characters = list(self.current_dialogue.characters.keys())
+        characters = self.current_dialogue.characters
         
         # If exactly 2 characters, return the other one
         if len(characters) == 2:
@@ -1296,8 +1896,8 @@ class DialogueEditorWindow(QMainWindow):
         selected_id = self.graph_view.get_selected_node_id()
         link_from_id = selected_id or self._last_active_node_id
         
-        if link_from_id and link_from_id in self.current_dialogue.nodes:
-            link_from_node = self.current_dialogue.nodes[link_from_id]
+        link_from_node = self.current_dialogue.nodes.get(link_from_id) if link_from_id else None
+        if link_from_node:
             # Position below (top-to-bottom flow)
             node.ui_pos.x = link_from_node.ui_pos.x
             node.ui_pos.y = link_from_node.ui_pos.y + 85
@@ -1306,10 +1906,10 @@ class DialogueEditorWindow(QMainWindow):
             old_next = link_from_node.next
             link_from_node.next = node.id
             node.next = old_next
-            
-            # Refresh the source node display
-            self.graph_view.refresh_node(link_from_id)
+            self.current_dialogue.retarget_incoming(old_next, node.id, link_from_id)
         else:
+            link_from_id = None
+            old_next = ""
             # No node to link from, position at top
             node.ui_pos.x = 0
             node.ui_pos.y = len(self.current_dialogue.nodes) * 85
@@ -1317,14 +1917,23 @@ class DialogueEditorWindow(QMainWindow):
         self.current_dialogue.add_node(node)
         self.current_dialogue.is_modified = True
         
-        self.graph_view.add_node(node, node.ui_pos.x, node.ui_pos.y)
-        self.graph_view._create_connections()
-        self.inspector._update_node_list()
+        # One repaint for the whole insert: only the rewired lines change
+        with self.graph_view._batched_scene_updates():
+            self.graph_view.add_node(node, node.ui_pos.x, node.ui_pos.y)
+            if link_from_id:
+                if old_next:
+                    self.graph_view.remove_connection(link_from_id, old_next)
+                    self.graph_view.add_connection(node.id, old_next)
+                self.graph_view.add_connection(link_from_id, node.id)
+                # Refresh the source node display
+                self.graph_view.refresh_node(link_from_id)
+            
+            # Select the new node and track it as last active
+            if node.id in self.graph_view.node_items:
+                self.graph_view.scene.clearSelection()
+                self.graph_view.node_items[node.id].setSelected(True)
         
-        # Select the new node and track it as last active
         if node.id in self.graph_view.node_items:
-            self.graph_view.scene.clearSelection()
-            self.graph_view.node_items[node.id].setSelected(True)
             self.inspector.load_node(node)
             self._last_active_node_id = node.id
         
@@ -1382,14 +1991,19 @@ class DialogueEditorWindow(QMainWindow):
             QFileDialog.Option.ShowDirsOnly
         )
         if path:
-            self.project = DialogueYAMLLoader.load_project(path)
-            self._refresh_dialogue_tree()
-            self.statusBar().showMessage(f"Opened: {path}")
+            self._load_project(path)
+    
+    def _load_project(self, path: str):
+        """Open a directory's dialogues; each file is parsed when first selected."""
+        self.project = DialogueYAMLLoader.load_project(path)
+        self._refresh_dialogue_tree()
+        self.statusBar().showMessage(f"Opened: {path}")
     
     def _save_current(self):
         """Save current dialogue."""
         if not self.current_dialogue:
             return
+        self.inspector._flush_node_changed()  # Apply the last edit before it's saved
         
         if not self.current_dialogue.file_path:
             # Need to get a path
@@ -1405,28 +2019,63 @@ class DialogueEditorWindow(QMainWindow):
         try:
             DialogueYAMLSaver.save_dialogue(self.current_dialogue)
             self.current_dialogue.is_modified = False
-            self._refresh_dialogue_tree()
+            # Only this dialogue's "*" marker changed
+            self._mark_dialogue_dirty(self.current_dialogue.id)
+            self._update_window_modified()
             self.statusBar().showMessage(f"Saved: {self.current_dialogue.file_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save: {e}")
     
     def _save_all(self):
         """Save all modified dialogues."""
-        if not self.project:
+        if not self.project or self._saving_all:
             return
+        self.inspector._flush_node_changed()  # Apply the last edit before it's saved
         
+        dirty = self.project.modified_dialogues()
         saved = 0
-        for dialogue in self.project.dialogues.values():
-            if dialogue.is_modified and dialogue.file_path:
-                try:
-                    DialogueYAMLSaver.save_dialogue(dialogue)
-                    dialogue.is_modified = False
+        errors = []
+        if dirty:
+            self._saving_all = True
+            # Snapshot the dialogues here and write the files on the thread pool;
+            # the modal progress dialog blocks editing until every write is done
+            progress = QProgressDialog("Saving dialogues...", None, 0, len(dirty), self)
+            progress.setWindowModality(Qt.WindowModality.WindowModal)
+            progress.setMinimumDuration(0)
+            progress.setValue(0)
+            loop = QEventLoop()
+            done = 0
+            
+            def on_finished(task: _SaveTask, error: str):
+                nonlocal done, saved
+                done += 1
+                if error:
+                    errors.append(f"{task.dialogue.id}: {error}")
+                else:
                     saved += 1
-                except Exception as e:
-                    print(f"Error saving {dialogue.id}: {e}")
+                    # An edit made while the file was written keeps the dialogue dirty
+                    if task.dialogue.edit_count == task.edit_count:
+                        task.dialogue.is_modified = False
+                progress.setValue(done)
+                if done == len(dirty):
+                    loop.quit()
+            
+            tasks = [_SaveTask(dialogue) for dialogue in dirty]
+            pool = QThreadPool.globalInstance()
+            for task in tasks:
+                task.setAutoDelete(False)  # Kept alive by tasks until the loop ends
+                task.signals.finished.connect(on_finished)
+                pool.start(task)
+            try:
+                loop.exec()
+            finally:
+                progress.close()
+                self._saving_all = False
         
         self._refresh_dialogue_tree()
         self.statusBar().showMessage(f"Saved {saved} dialogue(s)")
+        if errors:
+            QMessageBox.critical(self, "Error", "Failed to save:\n" + "\n".join(errors))
     
     def _new_dialogue(self):
         """Create a new dialogue."""
@@ -1443,11 +2092,11 @@ class DialogueEditorWindow(QMainWindow):
     
     def _delete_dialogue(self):
         """Delete selected dialogue."""
-        item = self.dialogue_tree.currentItem()
-        if not item or not self.project:
+        index = self.dialogue_tree.currentIndex()
+        if not index.isValid() or not self.project:
             return
         
-        dialogue_id = item.data(0, Qt.ItemDataRole.UserRole)
+        dialogue_id = index.data(Qt.ItemDataRole.UserRole)
         if dialogue_id:
             reply = QMessageBox.question(
                 self, "Delete",
@@ -1466,6 +2115,14 @@ class DialogueEditorWindow(QMainWindow):
         if node:
             self.statusBar().showMessage(f"Added {node_type.name} node: {node.id}")
     
+    def _add_choice_node(self):
+        """Add a CHOICE node (Ctrl+B)."""
+        self._add_node(NodeType.CHOICE)
+    
+    def _add_end_node(self):
+        """Add an END node (Ctrl+E)."""
+        self._add_node(NodeType.END)
+    
     def _delete_selected_node(self):
         """Delete the selected node."""
         if not self.current_dialogue:
@@ -1476,7 +2133,6 @@ class DialogueEditorWindow(QMainWindow):
             if isinstance(item, NodeGraphicsItem):
                 self.current_dialogue.remove_node(item.node.id)
                 self.graph_view.remove_node(item.node.id)
-                self.inspector._update_node_list()
     
     def _validate_current(self):
         """Validate current dialogue."""
@@ -1495,59 +2151,82 @@ class DialogueEditorWindow(QMainWindow):
     # ========== Event Handlers ==========
     
     def _refresh_dialogue_tree(self):
-        """Refresh the dialogue tree."""
-        self.dialogue_tree.clear()
-        if not self.project:
-            return
-        
-        for dialogue_id, dialogue in self.project.dialogues.items():
-            item = QTreeWidgetItem([dialogue.title or dialogue_id])
-            item.setData(0, Qt.ItemDataRole.UserRole, dialogue_id)
-            if dialogue.is_modified:
-                item.setText(0, f"* {item.text(0)}")
-            self.dialogue_tree.addTopLevelItem(item)
-    
-    def _on_dialogue_selected(self, item: QTreeWidgetItem):
+        """Refresh the dialogue list, touching only added or removed rows."""
+        self._dialogue_model.sync(self.project)
+        self._update_window_modified()
+    
+    def _flush_dirty_dialogues(self):
+        """Update the rows of dialogues edited since the last flush."""
+        for dialogue_id in self._dirty_dialogue_ids:
+            self._mark_dialogue_dirty(dialogue_id)
+        self._dirty_dialogue_ids.clear()
+        self._update_window_modified()
+    
+    def _update_window_modified(self):
+        """Show the title bar's unsaved-changes marker."""
+        self.setWindowModified(self._has_unsaved_changes())
+    
+    def _mark_dialogue_dirty(self, dialogue_id: str):
+        """Update the row of a single dialogue."""
+        self._dialogue_model.dialogue_changed(dialogue_id)
+    
+    def _on_dialogue_selected(self, index: QModelIndex):
         """Handle dialogue selection."""
-        dialogue_id = item.data(0, Qt.ItemDataRole.UserRole)
+        dialogue_id = index.data(Qt.ItemDataRole.UserRole)
         if dialogue_id and self.project:
-            self.current_dialogue = self.project.get_dialogue(dialogue_id)
+            # A pending edit belongs to the dialogue being left
+            self.inspector._flush_node_changed()
+            try:
+                dialogue = self.project.get_dialogue(dialogue_id)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to open: {e}")
+                return
+            if dialogue is None or dialogue.id != dialogue_id:
+                self._refresh_dialogue_tree()  # Row listed under a stale or empty file's ID
+            self.current_dialogue = dialogue
             if self.current_dialogue:
                 self._last_active_node_id = None  # Reset on dialogue change
                 self.graph_view.load_dialogue(self.current_dialogue)
+                # Inspector stays unblocked: set_dialogue flushes a pending edit via node_changed
                 self.inspector.set_dialogue(self.current_dialogue)
                 self.character_panel.set_dialogue(self.current_dialogue)
     
     def _on_node_selected(self, node_id: str):
         """Handle node selection in graph."""
-        if self.current_dialogue and node_id in self.current_dialogue.nodes:
-            node = self.current_dialogue.nodes[node_id]
+        node = self.current_dialogue.nodes.get(node_id) if self.current_dialogue else None
+        if node:
             self.inspector.load_node(node)
             self._last_active_node_id = node_id
     
     def _on_node_changed(self, node_id: str):
         """Handle node changes from inspector."""
+        if self.current_dialogue and node_id in self.current_dialogue.nodes:
+            self.current_dialogue.nodes[node_id].mark_dirty()
         self.graph_view.refresh_node(node_id)
         if self.current_dialogue:
             self.current_dialogue.is_modified = True
-            self._refresh_dialogue_tree()
+            self._queue_dialogue_dirty(self.current_dialogue.id)
+    
+    def _queue_dialogue_dirty(self, dialogue_id: str):
+        """Schedule a coalesced "*" marker update for a dialogue's row."""
+        self._dirty_dialogue_ids.add(dialogue_id)
+        if not self._dirty_timer.isActive():
+            self._dirty_timer.start()
     
     def _on_characters_changed(self):
         """Handle character list changes."""
         self.inspector._update_speaker_list()
-        self._refresh_dialogue_tree()
+        # Characters don't show in the dialogue list; only its modified marker may change
+        if self.current_dialogue:
+            self._queue_dialogue_dirty(self.current_dialogue.id)
     
     def _has_unsaved_changes(self) -> bool:
         """Check if there are any unsaved changes."""
-        if not self.project:
-            return False
-        for dialogue in self.project.dialogues.values():
-            if dialogue.is_modified:
-                return True
-        return False
+        return bool(self.project and self.project.modified_count)
     
     def closeEvent(self, event):
         """Handle window close with unsaved changes warning."""
+        self.inspector._flush_node_changed()  # Count the last edit as unsaved
         if self._has_unsaved_changes():
             reply = QMessageBox.question(
                 self, "Unsaved Changes",
@@ -1568,27 +2247,39 @@ class DialogueEditorWindow(QMainWindow):
             event.accept()
 
 
+# Dark theme
+DARK_PALETTE_COLORS = {
+    QPalette.ColorRole.Window: QColor(53, 53, 53),
+    QPalette.ColorRole.WindowText: QColor(Qt.GlobalColor.white),
+    QPalette.ColorRole.Base: QColor(35, 35, 35),
+    QPalette.ColorRole.AlternateBase: QColor(53, 53, 53),
+    QPalette.ColorRole.ToolTipBase: QColor(25, 25, 25),
+    QPalette.ColorRole.ToolTipText: QColor(Qt.GlobalColor.white),
+    QPalette.ColorRole.Text: QColor(Qt.GlobalColor.white),
+    QPalette.ColorRole.Button: QColor(53, 53, 53),
+    QPalette.ColorRole.ButtonText: QColor(Qt.GlobalColor.white),
+    QPalette.ColorRole.BrightText: QColor(Qt.GlobalColor.red),
+    QPalette.ColorRole.Link: QColor(42, 130, 218),
+    QPalette.ColorRole.Highlight: QColor(42, 130, 218),
+    QPalette.ColorRole.HighlightedText: QColor(Qt.GlobalColor.white),
+}
+
+
+@lru_cache(maxsize=1)
+def _dark_palette() -> QPalette:
+    """Build the dark palette on top of the application's default one (needs a QApplication)."""
+    palette = QApplication.palette()
+    for role, color in DARK_PALETTE_COLORS.items():
+        palette.setColor(role, color)
+    return palette
+
+
 def main():
     """Main entry point."""
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
-    # Dark theme
-    palette = app.palette()
-    palette.setColor(palette.ColorRole.Window, QColor(53, 53, 53))
-    palette.setColor(palette.ColorRole.WindowText, Qt.GlobalColor.white)
-    palette.setColor(palette.ColorRole.Base, QColor(35, 35, 35))
-    palette.setColor(palette.ColorRole.AlternateBase, QColor(53, 53, 53))
-    palette.setColor(palette.ColorRole.ToolTipBase, QColor(25, 25, 25))
-    palette.setColor(palette.ColorRole.ToolTipText, Qt.GlobalColor.white)
-    palette.setColor(palette.ColorRole.Text, Qt.GlobalColor.white)
-    palette.setColor(palette.ColorRole.Button, QColor(53, 53, 53))
-    palette.setColor(palette.ColorRole.ButtonText, Qt.GlobalColor.white)
-    palette.setColor(palette.ColorRole.BrightText, Qt.GlobalColor.red)
-    palette.setColor(palette.ColorRole.Link, QColor(42, 130, 218))
-    palette.setColor(palette.ColorRole.Highlight, QColor(42, 130, 218))
-    palette.setColor(palette.ColorRole.HighlightedText, Qt.GlobalColor.white)
-    app.setPalette(palette)
+    app.setPalette(_dark_palette())
     
     window = DialogueEditorWindow()
     window.show()
@@ -3,10 +3,12 @@ Data models for the dialogue editor.
 Independent of UI - pure Python data structures.
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Optional, Any
-import uuid
+from typing import Optional, Any, Callable, Literal
+import random
+import sys
 
 
 class NodeType(Enum):
@@ -20,14 +22,14 @@ class NodeType(Enum):
     SIGNAL = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class NodePosition:
     """UI position for graph display."""
     x: float = 0.0
     y: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ChoiceOption:
     """A single choice in a CHOICE node."""
     text: str = ""
@@ -35,7 +37,19 @@ class ChoiceOption:
     condition: Optional[str] = None
 
 
-@dataclass
+EdgeKind = Literal["next", "choice", "then", "else", "jump"]
+
+
+@dataclass(frozen=True)
+class Edge:
+    """A directed connection from one node to another."""
+    src: str
+    dst: str
+    kind: EdgeKind = "next"
+    choice_index: Optional[int] = None  # Set for "choice" edges
+
+
+@dataclass(slots=True)
 class DialogueNode:
     """A single node in the dialogue graph."""
     id: str = ""
@@ -72,12 +86,94 @@ class DialogueNode:
     # UI metadata
     ui_pos: NodePosition = field(default_factory=NodePosition)
     
+    # Cached preview text (see display_content)
+    _display_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _display_dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    
+    # Max choices listed in the preview
+    DISPLAY_MAX_CHOICES = 3
+    
     def __post_init__(self):
         if not self.id:
-            self.id = uuid.uuid4().hex[:5]  # Short 5-char hex ID
+            self.id = f"{random.getrandbits(20):05x}"  # Short 5-char hex ID
+    
+    @classmethod
+    def blank(cls, node_id: str, ui_pos: NodePosition) -> "DialogueNode":
+        """Create an empty SAY node for a loader to fill in, bypassing the generated __init__."""
+        node = object.__new__(cls)
+        node.id = node_id or f"{random.getrandbits(20):05x}"
+        node.type = NodeType.SAY
+        node.speaker = node.text = ""
+        node.condition = node.then_node = node.else_node = ""
+        node.jump_target = node.signal_name = node.outcome = node.next = ""
+        # Containers stay per-node: the editor mutates them in place
+        node.choices = []
+        node.assignments = {}
+        node.signal_args = {}
+        node.ui_pos = ui_pos
+        node._display_cache = None
+        node._display_dirty = True
+        return node
+    
+    def outgoing_edges(self) -> list[Edge]:
+        """Get all outgoing connections of this node."""
+        edges = []
+        if self.next:
+            edges.append(Edge(self.id, self.next, "next"))
+        for i, choice in enumerate(self.choices):
+            if choice.next:
+                edges.append(Edge(self.id, choice.next, "choice", i))
+        if self.then_node:
+            edges.append(Edge(self.id, self.then_node, "then"))
+        if self.else_node:
+            edges.append(Edge(self.id, self.else_node, "else"))
+        if self.jump_target:
+            edges.append(Edge(self.id, self.jump_target, "jump"))
+        return edges
+    
+    def mark_dirty(self) -> None:
+        """Invalidate the cached preview text after an edit."""
+        self._display_dirty = True
+    
+    @property
+    def display_content(self) -> str:
+        """Short preview of the node content (cached until mark_dirty)."""
+        if not self._display_dirty:
+            return self._display_cache
+        
+        content = ""
+        if self.type == NodeType.SAY:
+            speaker = self.speaker or "???"
+            text = self.text[:80] + "..." if len(self.text) > 80 else self.text
+            content = f"{speaker}: {text}"
+        elif self.type == NodeType.CHOICE:
+            # Show numbered choices
+            max_choices = self.DISPLAY_MAX_CHOICES
+            choice_lines = []
+            for i, choice in enumerate(self.choices[:max_choices], 1):
+                choice_text = choice.text[:50] + "..." if len(choice.text) > 50 else choice.text
+                target = f" → {choice.next}" if choice.next else ""
+                choice_lines.append(f"{i}. {choice_text}{target}")
+            if len(self.choices) > max_choices:
+                choice_lines.append(f"... +{len(self.choices) - max_choices} more")
+            content = '\n'.join(choice_lines) if choice_lines else "(no choices)"
+        elif self.type == NodeType.SET:
+            content = ", ".join(f"{k}={v}" for k, v in list(self.assignments.items())[:2])
+        elif self.type == NodeType.IF:
+            content = f"if {self.condition}"
+        elif self.type == NodeType.JUMP:
+            content = f"→ {self.jump_target}"
+        elif self.type == NodeType.END:
+            content = f"END: {self.outcome}" if self.outcome else "END"
+        elif self.type == NodeType.SIGNAL:
+            content = f"signal: {self.signal_name}"
+        
+        self._display_cache = content
+        self._display_dirty = False
+        return content
 
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     """A character that can speak in dialogues."""
     id: str = ""
@@ -88,12 +184,12 @@ class Character:
     
     def __post_init__(self):
         if not self.id:
-            self.id = f"char_{uuid.uuid4().hex[:8]}"
+            self.id = f"char_{random.getrandbits(32):08x}"
         if not self.name:
             self.name = self.id
 
 
-@dataclass
+@dataclass(slots=True)
 class Dialogue:
     """A complete dialogue with nodes and characters."""
     id: str = ""
@@ -106,19 +202,61 @@ class Dialogue:
     # File path (for save/load)
     file_path: Optional[str] = None
     
-    # Dirty flag
-    is_modified: bool = False
+    # Dirty flag (see is_modified)
+    _is_modified: bool = False
+    
+    # Bumped on structural edits (nodes, links, speakers) so views can cache derived data
+    revision: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # Bumped on every edit (each is_modified = True), so a save can tell if it is stale
+    edit_count: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # Nodes along the next-chain from start, for the revision it was built at
+    _ordered_chain: Optional[list[DialogueNode]] = field(default=None, init=False, repr=False, compare=False)
+    _ordered_chain_rev: int = field(default=-1, init=False, repr=False, compare=False)
+    
+    # Incoming edge count per target node (see incoming_node_ids)
+    _incoming: Optional[Counter] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Target node -> IDs of nodes that may link to it (a superset; see remove_node)
+    _referrers: Optional[dict[str, set[str]]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Owning project, whose modified_count follows is_modified
+    _project: Optional["Project"] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.id:
-            self.id = f"dialogue_{uuid.uuid4().hex[:8]}"
+            self.id = f"dialogue_{random.getrandbits(32):08x}"
         if not self.title:
             self.title = self.id
     
+    @property
+    def is_modified(self) -> bool:
+        """Whether the dialogue has unsaved changes."""
+        return self._is_modified
+    
+    @is_modified.setter
+    def is_modified(self, value: bool) -> None:
+        if value:
+            self.edit_count += 1
+        if value != self._is_modified:
+            self._is_modified = value
+            if self._project is not None:
+                self._project.modified_count += 1 if value else -1
+    
     def add_node(self, node: DialogueNode) -> None:
         """Add a node to the dialogue."""
+        node.id = sys.intern(node.id)  # Loaded IDs are interned; keep editor-made ones alike
         self.nodes[node.id] = node
         self.is_modified = True
+        self.revision += 1
+        if self._incoming is not None or self._referrers is not None:
+            targets = [edge.dst for edge in node.outgoing_edges()]
+            if self._incoming is not None:
+                self._incoming.update(targets)
+            if self._referrers is not None:
+                for target in targets:
+                    self._referrers.setdefault(target, set()).add(node.id)
         
         # Set as start if first node
         if not self.start:
@@ -127,14 +265,27 @@ class Dialogue:
     def remove_node(self, node_id: str) -> None:
         """Remove a node and clean up references."""
         if node_id in self.nodes:
-            del self.nodes[node_id]
+            removed = self.nodes.pop(node_id)
             self.is_modified = True
+            self.revision += 1
             
-            # Clean up references
+            # Clean up references; only nodes that may link here need a look
             if self.start == node_id:
                 self.start = ""
             
-            for node in self.nodes.values():
+            if self._referrers is None:
+                self._build_referrers()
+            referrers = self._referrers.pop(node_id, ())
+            if self._incoming is not None:
+                self._incoming.pop(node_id, None)  # Every link to it is cleared below
+                for edge in removed.outgoing_edges():
+                    if edge.dst != node_id:
+                        self.retarget_incoming(edge.dst, "")
+            
+            for referrer_id in referrers:
+                node = self.nodes.get(referrer_id)
+                if node is None:
+                    continue
                 if node.next == node_id:
                     node.next = ""
                 if node.then_node == node_id:
@@ -143,9 +294,62 @@ class Dialogue:
                     node.else_node = ""
                 if node.jump_target == node_id:
                     node.jump_target = ""
+                    node.mark_dirty()
                 for choice in node.choices:
                     if choice.next == node_id:
                         choice.next = ""
+                        node.mark_dirty()
+    
+    def ordered_chain(self) -> list[DialogueNode]:
+        """Get the nodes reached by following next from start (cached per revision)."""
+        if self._ordered_chain is None or self._ordered_chain_rev != self.revision:
+            chain = []
+            visited = set()
+            current = self.start
+            while current and current not in visited:
+                visited.add(current)
+                node = self.nodes.get(current)
+                if node is None:
+                    break
+                chain.append(node)
+                current = node.next
+            self._ordered_chain = chain
+            self._ordered_chain_rev = self.revision
+        return self._ordered_chain
+    
+    def incoming_node_ids(self):
+        """Get the IDs of nodes that something links to (cached)."""
+        if self._incoming is None:
+            self._incoming = Counter(
+                edge.dst for node in self.nodes.values() for edge in node.outgoing_edges()
+            )
+        return self._incoming.keys()
+    
+    def _build_referrers(self) -> None:
+        """Index, for every link target, the nodes linking to it."""
+        referrers: dict[str, set[str]] = {}
+        for node in self.nodes.values():
+            for edge in node.outgoing_edges():
+                referrers.setdefault(edge.dst, set()).add(node.id)
+        self._referrers = referrers
+    
+    def retarget_incoming(self, old_target: str, new_target: str, src: Optional[str] = None) -> None:
+        """Keep the link caches in sync after one link of node src changed target."""
+        if old_target == new_target:
+            return
+        if new_target and self._referrers is not None:
+            if src is None:
+                self._referrers = None  # Unknown source; rebuilt on next removal
+            else:
+                self._referrers.setdefault(new_target, set()).add(src)
+        if self._incoming is None:
+            return
+        if old_target:
+            self._incoming[old_target] -= 1
+            if self._incoming[old_target] <= 0:
+                del self._incoming[old_target]
+        if new_target:
+            self._incoming[new_target] += 1
     
     def add_character(self, character: Character) -> None:
         """Add a character to the dialogue."""
@@ -178,62 +382,71 @@ class Dialogue:
         elif self.start not in self.nodes:
             errors.append(f"Start node '{self.start}' does not exist")
         
-        # Check all node references
-        for node_id, node in self.nodes.items():
-            if node.next and node.next not in self.nodes:
-                errors.append(f"Node '{node_id}': 'next' references unknown node '{node.next}'")
+        # Check all node references, collecting each node's existing targets on the way;
+        # the walk below runs on node indices (dict order) rather than ID strings
+        nodes = self.nodes
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        adj: list[list[int]] = []
+        for node_id, node in nodes.items():
+            node_type = node.type
+            targets = []
             
-            if node.type == NodeType.CHOICE:
-                for i, choice in enumerate(node.choices):
-                    if choice.next and choice.next not in self.nodes:
-                        errors.append(f"Node '{node_id}' choice {i}: references unknown node '{choice.next}'")
+            if node.next:
+                if node.next in index:
+                    targets.append(index[node.next])
+                else:
+                    errors.append(f"Node '{node_id}': 'next' references unknown node '{node.next}'")
             
-            if node.type == NodeType.IF:
-                if node.then_node and node.then_node not in self.nodes:
-                    errors.append(f"Node '{node_id}': 'then' references unknown node '{node.then_node}'")
-                if node.else_node and node.else_node not in self.nodes:
-                    errors.append(f"Node '{node_id}': 'else' references unknown node '{node.else_node}'")
+            for i, choice in enumerate(node.choices):
+                if not choice.next:
+                    continue
+                if choice.next in index:
+                    targets.append(index[choice.next])
+                elif node_type == NodeType.CHOICE:
+                    errors.append(f"Node '{node_id}' choice {i}: references unknown node '{choice.next}'")
             
-            if node.type == NodeType.JUMP:
-                if node.jump_target and node.jump_target not in self.nodes:
-                    errors.append(f"Node '{node_id}': 'jump' references unknown node '{node.jump_target}'")
+            for label, target, checked_type in (
+                ("then", node.then_node, NodeType.IF),
+                ("else", node.else_node, NodeType.IF),
+                ("jump", node.jump_target, NodeType.JUMP),
+            ):
+                if not target:
+                    continue
+                if target in index:
+                    targets.append(index[target])
+                elif node_type == checked_type:
+                    errors.append(f"Node '{node_id}': '{label}' references unknown node '{target}'")
             
             # Check speaker exists
-            if node.type == NodeType.SAY and node.speaker:
+            if node_type == NodeType.SAY and node.speaker:
                 if node.speaker not in self.characters:
                     errors.append(f"Node '{node_id}': speaker '{node.speaker}' not in characters")
+            
+            adj.append(targets)
         
-        # Find unreachable nodes
-        reachable = set()
-        self._find_reachable(self.start, reachable)
-        for node_id in self.nodes:
-            if node_id not in reachable:
-                errors.append(f"Node '{node_id}' is unreachable from start")
+        # Find unreachable nodes (none if the walk reached every node)
+        start = index.get(self.start)
+        visited = self._find_reachable(start, adj) if start is not None else bytearray(len(adj))
+        if visited.count(1) < len(nodes):
+            errors.extend(
+                f"Node '{node_id}' is unreachable from start"
+                for node_id, seen in zip(nodes, visited) if not seen
+            )
         
         return errors
     
-    def _find_reachable(self, node_id: str, visited: set) -> None:
-        """Recursively find all reachable nodes."""
-        if not node_id or node_id in visited or node_id not in self.nodes:
-            return
-        
-        visited.add(node_id)
-        node = self.nodes[node_id]
-        
-        # Follow all outgoing edges
-        if node.next:
-            self._find_reachable(node.next, visited)
-        
-        for choice in node.choices:
-            if choice.next:
-                self._find_reachable(choice.next, visited)
-        
-        if node.then_node:
-            self._find_reachable(node.then_node, visited)
-        if node.else_node:
-            self._find_reachable(node.else_node, visited)
-        if node.jump_target:
-            self._find_reachable(node.jump_target, visited)
+    @staticmethod
+    def _find_reachable(start: int, adj: list[list[int]]) -> bytearray:
+        """Flag the nodes reachable from start over an index adjacency list (iterative DFS)."""
+        visited = bytearray(len(adj))
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            if visited[i]:
+                continue
+            visited[i] = 1
+            stack.extend(adj[i])
+        return visited
 
 
 @dataclass
@@ -242,15 +455,89 @@ class Project:
     dialogues: dict[str, Dialogue] = field(default_factory=dict)
     root_path: str = ""
     
+    # Parses a dialogue file on first access (e.g. DialogueYAMLLoader.load_dialogue)
+    loader: Optional[Callable[[str], Optional[Dialogue]]] = field(default=None, repr=False, compare=False)
+    
+    # Dialogues listed but not parsed yet: dialogue_id -> (title, file path)
+    _pending: dict[str, tuple[str, str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    # Number of dialogues with unsaved changes
+    modified_count: int = field(default=0, init=False, compare=False)
+    
+    def __post_init__(self):
+        for dialogue in self.dialogues.values():
+            self._attach(dialogue)
+    
+    def _attach(self, dialogue: Dialogue) -> None:
+        dialogue._project = self
+        if dialogue.is_modified:
+            self.modified_count += 1
+    
+    def _detach(self, dialogue: Dialogue) -> None:
+        dialogue._project = None
+        if dialogue.is_modified:
+            self.modified_count -= 1
+    
     def add_dialogue(self, dialogue: Dialogue) -> None:
         """Add a dialogue to the project."""
+        old = self.dialogues.get(dialogue.id)
+        if old is dialogue:
+            return
+        if old is not None:
+            self._detach(old)
+        self._pending.pop(dialogue.id, None)
         self.dialogues[dialogue.id] = dialogue
+        self._attach(dialogue)
+    
+    def add_pending(self, dialogue_id: str, title: str, file_path: str) -> None:
+        """List a dialogue file to be parsed by get_dialogue on first access."""
+        if dialogue_id not in self.dialogues:
+            self._pending[dialogue_id] = (title, file_path)
     
     def remove_dialogue(self, dialogue_id: str) -> None:
         """Remove a dialogue from the project."""
+        self._pending.pop(dialogue_id, None)
         if dialogue_id in self.dialogues:
-            del self.dialogues[dialogue_id]
+            self._detach(self.dialogues.pop(dialogue_id))
+    
+    def dialogue_ids(self) -> list[str]:
+        """Get the IDs of all dialogues, parsed or not."""
+        return [*self.dialogues, *self._pending]
+    
+    def dialogue_title(self, dialogue_id: str) -> str:
+        """Get the title of a dialogue, parsed or not (its ID if it has none)."""
+        dialogue = self.dialogues.get(dialogue_id)
+        if dialogue is not None:
+            return dialogue.title or dialogue_id
+        title, _ = self._pending.get(dialogue_id, ("", ""))
+        return title or dialogue_id
     
     def get_dialogue(self, dialogue_id: str) -> Optional[Dialogue]:
-        """Get a dialogue by ID."""
-        return self.dialogues.get(dialogue_id)
+        """Get a dialogue by ID, parsing its file on first access.
+        
+        A file whose parsed ID differs from the listed one is registered
+        under its parsed ID, dropping the listed key. A file that fails to
+        parse stays listed, so it can be opened again once fixed.
+        """
+        dialogue = self.dialogues.get(dialogue_id)
+        if dialogue is None and dialogue_id in self._pending and self.loader:
+            _, file_path = self._pending[dialogue_id]
+            dialogue = self.loader(file_path)
+            self._pending.pop(dialogue_id, None)
+            if dialogue:
+                dialogue.file_path = file_path
+                self.add_dialogue(dialogue)
+        return dialogue
+    
+    def modified_dialogues(self) -> list[Dialogue]:
+        """Get the dialogues with unsaved changes that have a file to save to."""
+        if not self.modified_count:
+            return []
+        return [d for d in self.dialogues.values() if d.is_modified and d.file_path]
+    
+    def save_all(self, save: Callable[[Dialogue], str]) -> list[str]:
+        """Save only the modified dialogues with save (e.g. DialogueYAMLSaver.save_dialogue).
+        
+        Returns the paths written.
+        """
+        return [save(dialogue) for dialogue in self.modified_dialogues()]
@@ -4,45 +4,125 @@ Handles loading, saving, and round-trip preservation.
 """
 
 import os
-from pathlib import Path
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from typing import Optional, Any
 
 import yaml
 
+# libyaml bindings parse and emit several times faster; fall back when PyYAML is built without them
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 from .models import (
     Project, Dialogue, DialogueNode, Character,
     NodeType, ChoiceOption, NodePosition
 )
 
 
+# Top-level "id:"/"title:" lines, read from a file to list it without parsing
+_ID_LINE = re.compile(r"^id:.*$", re.MULTILINE)
+_TITLE_LINE = re.compile(r"^title:.*$", re.MULTILINE)
+_ID_PEEK_SIZE = 1024
+
+
+def _node_ref(value: Any) -> str:
+    """Normalize a node reference from YAML: interned string, or "" if unset."""
+    return sys.intern(str(value)) if value else ""
+
+
 class DialogueYAMLLoader:
     """Load dialogues from YAML files."""
     
     @staticmethod
     def load_project(root_path: str) -> Project:
-        """Load all dialogues from a directory."""
-        project = Project(root_path=root_path)
+        """List the dialogues of a directory; each is parsed on first get_dialogue."""
+        project = Project(root_path=root_path, loader=DialogueYAMLLoader.load_dialogue)
         
-        src_dir = Path(root_path)
-        if not src_dir.exists():
-            return project
-        
-        for yaml_file in list(src_dir.glob("*.yaml")) + list(src_dir.glob("*.yml")):
+        # Only files whose ID and title can't be peeked are parsed up front
+        files = []
+        for yaml_file in DialogueYAMLLoader.project_files(root_path):
             try:
-                dialogue = DialogueYAMLLoader.load_dialogue(str(yaml_file))
-                if dialogue:
-                    dialogue.file_path = str(yaml_file)
-                    project.add_dialogue(dialogue)
-            except Exception as e:
+                header = DialogueYAMLLoader.peek_dialogue_header(yaml_file)
+            except (OSError, UnicodeDecodeError) as e:
                 print(f"Error loading {yaml_file}: {e}")
+                continue
+            if header:
+                project.add_pending(*header, yaml_file)
+            else:
+                files.append(yaml_file)
+        if not files:
+            return project
+        
+        # Files are independent; parse them in parallel but add them in file order
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+            futures = [executor.submit(DialogueYAMLLoader.load_dialogue, f) for f in files]
+            for yaml_file, future in zip(files, futures):
+                try:
+                    dialogue = future.result()
+                    if dialogue:
+                        dialogue.file_path = yaml_file
+                        project.add_dialogue(dialogue)
+                except Exception as e:
+                    print(f"Error loading {yaml_file}: {e}")
         
         return project
     
+    @staticmethod
+    def project_files(root_path: str) -> list[str]:
+        """List the dialogue files of a directory (.yaml first, then .yml)."""
+        # One directory read instead of a glob per extension
+        try:
+            with os.scandir(root_path) as entries:
+                names = [
+                    entry.name for entry in entries
+                    if entry.name.endswith((".yaml", ".yml")) and not entry.name.startswith(".")
+                    and entry.is_file()
+                ]
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        return ([os.path.join(root_path, n) for n in names if n.endswith(".yaml")]
+                + [os.path.join(root_path, n) for n in names if n.endswith(".yml")])
+    
+    @staticmethod
+    def peek_dialogue_header(file_path: str) -> Optional[tuple[str, str]]:
+        """Read a dialogue's (ID, title) without parsing it (None if they can't be read)."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            head = f.read(_ID_PEEK_SIZE)
+            match = _ID_LINE.search(head)
+            if not match or (match.end() == len(head) == _ID_PEEK_SIZE):
+                return None  # Missing, or cut off by the peek size
+            dialogue_id = DialogueYAMLLoader._peek_value(match.group(), "id")
+            if not dialogue_id:
+                return None
+            # The title normally follows the ID; only scan the rest when it doesn't
+            title_match = _TITLE_LINE.search(head)
+            if not title_match or title_match.end() == len(head):
+                head += f.read()
+                title_match = _TITLE_LINE.search(head)
+        if not title_match:
+            return dialogue_id, ""
+        title = DialogueYAMLLoader._peek_value(title_match.group(), "title")
+        return (dialogue_id, title) if title is not None else None
+    
+    @staticmethod
+    def _peek_value(line: str, key: str) -> Optional[str]:
+        """Parse a plain top-level "key: value" line (None unless the value is a string)."""
+        try:
+            value = yaml.load(line, Loader=SafeLoader)[key]
+        except (yaml.YAMLError, TypeError):
+            return None  # Not a plain "key: value" line
+        return value if isinstance(value, str) else None
+    
     @staticmethod
     def load_dialogue(file_path: str) -> Optional[Dialogue]:
         """Load a single dialogue from a YAML file."""
         with open(file_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=SafeLoader)
         
         if not data:
             return None
@@ -50,13 +130,14 @@ class DialogueYAMLLoader:
         dialogue = Dialogue(
             id=data.get("id", ""),
             title=data.get("title", ""),
-            start=str(data.get("start", "")) if data.get("start") else "",
+            start=_node_ref(data.get("start")),
             tags=data.get("tags", []),
             file_path=file_path,
         )
         
-        # Load characters
+        # Load characters (IDs interned: they are looked up per node as speakers)
         for char_id, char_data in data.get("characters", {}).items():
+            char_id = sys.intern(str(char_id))
             if isinstance(char_data, dict):
                 character = Character(
                     id=char_id,
@@ -69,9 +150,10 @@ class DialogueYAMLLoader:
                 character = Character(id=char_id, name=str(char_data))
             dialogue.characters[char_id] = character
         
-        # Load nodes (convert IDs to strings in case YAML parsed them as ints)
+        # Load nodes (convert IDs to strings in case YAML parsed them as ints;
+        # interned so the many ID lookups/comparisons in the editor stay cheap)
         for node_id, node_data in data.get("nodes", {}).items():
-            node_id_str = str(node_id)
+            node_id_str = sys.intern(str(node_id))
             node = DialogueYAMLLoader._parse_node(node_id_str, node_data)
             dialogue.nodes[node_id_str] = node
         
@@ -81,50 +163,20 @@ class DialogueYAMLLoader:
     @staticmethod
     def _parse_node(node_id: str, data: dict) -> DialogueNode:
         """Parse a node from YAML data."""
-        node = DialogueNode(id=node_id)
-        
-        # Determine type and parse accordingly
-        if "say" in data:
-            node.type = NodeType.SAY
-            say_data = data["say"]
-            if isinstance(say_data, dict):
-                node.speaker = say_data.get("speaker", "")
-                node.text = say_data.get("text", "")
-            else:
-                node.text = str(say_data)
-        
-        elif "choice" in data:
-            node.type = NodeType.CHOICE
-            for choice_data in data["choice"]:
-                choice = ChoiceOption(
-                    text=choice_data.get("text", ""),
-                    next=str(choice_data.get("next", "")) if choice_data.get("next") else "",
-                    condition=choice_data.get("if"),
-                )
-                node.choices.append(choice)
-        
-        elif "set" in data:
-            node.type = NodeType.SET
-            node.assignments = data["set"]
-        
-        elif "if" in data:
-            node.type = NodeType.IF
-            node.condition = str(data["if"])
-            node.then_node = str(data.get("then", "")) if data.get("then") else ""
-            node.else_node = str(data.get("else", "")) if data.get("else") else ""
-        
-        elif "jump" in data:
-            node.type = NodeType.JUMP
-            node.jump_target = str(data["jump"]) if data.get("jump") else ""
+        ui = data.get("ui")
+        node = DialogueNode.blank(
+            node_id,
+            NodePosition(x=ui.get("x", 0), y=ui.get("y", 0)) if ui is not None else NodePosition(),
+        )
         
-        elif "signal" in data:
-            node.type = NodeType.SIGNAL
-            sig = data["signal"]
-            if isinstance(sig, dict):
-                node.signal_name = sig.get("name", "")
-                node.signal_args = sig.get("args", {})
+        # Determine type and parse accordingly (usually exactly one type key)
+        type_keys = data.keys() & _NODE_TYPE_KEYS
+        if type_keys:
+            if len(type_keys) == 1:
+                key = type_keys.pop()
             else:
-                node.signal_name = str(sig)
+                key = next(k for k in _NODE_PARSERS if k in type_keys)  # First in priority order wins
+            _NODE_PARSERS[key](node, data)
         
         # Check for end
         if "end" in data:
@@ -133,20 +185,74 @@ class DialogueYAMLLoader:
                 node.outcome = str(data["end"])
         
         # Common fields
-        if "next" in data:
-            node.next = str(data["next"]) if data["next"] else ""
-        
-        # UI position (if stored)
-        if "ui" in data:
-            ui = data["ui"]
-            node.ui_pos = NodePosition(
-                x=ui.get("x", 0),
-                y=ui.get("y", 0),
-            )
+        node.next = _node_ref(data.get("next"))
         
         return node
 
 
+def _parse_say(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.SAY
+    say_data = data["say"]
+    if isinstance(say_data, dict):
+        node.speaker = sys.intern(str(say_data.get("speaker") or ""))
+        node.text = say_data.get("text", "")
+    else:
+        node.text = str(say_data)
+
+
+def _parse_choice(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.CHOICE
+    for choice_data in data["choice"]:
+        choice = ChoiceOption(
+            text=choice_data.get("text", ""),
+            next=_node_ref(choice_data.get("next")),
+            condition=choice_data.get("if"),
+        )
+        node.choices.append(choice)
+
+
+def _parse_set(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.SET
+    node.assignments = data["set"]
+
+
+def _parse_if(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.IF
+    node.condition = str(data["if"])
+    node.then_node = _node_ref(data.get("then"))
+    node.else_node = _node_ref(data.get("else"))
+
+
+def _parse_jump(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.JUMP
+    node.jump_target = _node_ref(data["jump"])
+
+
+def _parse_signal(node: DialogueNode, data: dict) -> None:
+    node.type = NodeType.SIGNAL
+    sig = data["signal"]
+    if isinstance(sig, dict):
+        node.signal_name = sig.get("name", "")
+        node.signal_args = sig.get("args", {})
+    else:
+        node.signal_name = str(sig)
+
+
+# Node type key -> parser, in priority order for nodes that carry several type keys
+_NODE_PARSERS = {
+    "say": _parse_say,
+    "choice": _parse_choice,
+    "set": _parse_set,
+    "if": _parse_if,
+    "jump": _parse_jump,
+    "signal": _parse_signal,
+}
+_NODE_TYPE_KEYS = frozenset(_NODE_PARSERS)
+
+# Node types whose links live in their own fields, so "next" is not saved
+_BRANCHING_TYPES = frozenset((NodeType.CHOICE, NodeType.IF, NodeType.JUMP, NodeType.END))
+
+
 class DialogueYAMLSaver:
     """Save dialogues to YAML files."""
     
@@ -157,120 +263,124 @@ class DialogueYAMLSaver:
         if not path:
             raise ValueError("No file path specified")
         
-        data = DialogueYAMLSaver._dialogue_to_dict(dialogue)
-        
-        yaml_str = yaml.dump(
-            data,
-            allow_unicode=True,
-            default_flow_style=False,
-            sort_keys=False,
-            width=120,
-        )
-        
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        
+        DialogueYAMLSaver.write_dict(DialogueYAMLSaver._dialogue_to_dict(dialogue), path)
         dialogue.file_path = path
         dialogue.is_modified = False
         return path
     
+    @staticmethod
+    def write_dict(data: dict, path: str) -> None:
+        """Write a dialogue dictionary (see _dialogue_to_dict) to a YAML file."""
+        # Emit straight into a sibling temp file, then swap it in, so a failed
+        # dump never leaves a half-written dialogue behind
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                yaml.dump(
+                    data,
+                    f,
+                    Dumper=SafeDumper,
+                    allow_unicode=True,
+                    default_flow_style=False,
+                    sort_keys=False,
+                    width=120,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
     @staticmethod
     def _dialogue_to_dict(dialogue: Dialogue) -> dict:
-        """Convert dialogue to dictionary for YAML serialization."""
-        data = {
-            "id": dialogue.id,
-        }
+        """Convert dialogue to dictionary for YAML serialization.
         
+        Mutable fields (tags, assignments, signal args) are copied, so the result
+        can be dumped on another thread while the dialogue is edited.
+        """
+        header = {"id": dialogue.id}
         if dialogue.title and dialogue.title != dialogue.id:
-            data["title"] = dialogue.title
-        
+            header["title"] = dialogue.title
         if dialogue.tags:
-            data["tags"] = dialogue.tags
-        
-        # Characters
+            header["tags"] = copy(dialogue.tags)
         if dialogue.characters:
-            data["characters"] = {}
-            for char_id, char in dialogue.characters.items():
-                char_data = {"name": char.name}
-                if char.portrait:
-                    char_data["portrait"] = char.portrait
-                if char.color and char.color != "#ffffff":
-                    char_data["color"] = char.color
-                if char.tags:
-                    char_data["tags"] = char.tags
-                data["characters"][char_id] = char_data
-        
-        # Start node
-        data["start"] = dialogue.start
-        
-        # Nodes
-        data["nodes"] = {}
-        for node_id, node in dialogue.nodes.items():
-            node_data = DialogueYAMLSaver._node_to_dict(node)
-            data["nodes"][node_id] = node_data
+            header["characters"] = {
+                char_id: DialogueYAMLSaver._character_to_dict(char)
+                for char_id, char in dialogue.characters.items()
+            }
         
+        # Node table is built in one go rather than key by key
+        return {
+            **header,
+            "start": dialogue.start,
+            "nodes": {
+                node_id: DialogueYAMLSaver._node_to_dict(node)
+                for node_id, node in dialogue.nodes.items()
+            },
+        }
+    
+    @staticmethod
+    def _character_to_dict(char: Character) -> dict:
+        """Convert a character to dictionary."""
+        data = {"name": char.name}
+        if char.portrait:
+            data["portrait"] = char.portrait
+        if char.color and char.color != "#ffffff":
+            data["color"] = char.color
+        if char.tags:
+            data["tags"] = copy(char.tags)
         return data
     
     @staticmethod
     def _node_to_dict(node: DialogueNode) -> dict:
         """Convert a node to dictionary."""
-        data = {}
-        
         # Type-specific content
         if node.type == NodeType.SAY:
-            data["say"] = {
-                "speaker": node.speaker,
-                "text": node.text,
-            }
+            content = {"say": {"speaker": node.speaker, "text": node.text}}
         
         elif node.type == NodeType.CHOICE:
             choices = []
             for choice in node.choices:
-                choice_data = {
-                    "text": choice.text,
-                    "next": choice.next,
-                }
+                choice_data = {"text": choice.text, "next": choice.next}
                 if choice.condition:
                     choice_data["if"] = choice.condition
                 choices.append(choice_data)
-            data["choice"] = choices
+            content = {"choice": choices}
         
         elif node.type == NodeType.SET:
-            data["set"] = node.assignments
+            content = {"set": copy(node.assignments)}
         
         elif node.type == NodeType.IF:
-            data["if"] = node.condition
+            content = {"if": node.condition}
             if node.then_node:
-                data["then"] = node.then_node
+                content["then"] = node.then_node
             if node.else_node:
-                data["else"] = node.else_node
+                content["else"] = node.else_node
         
         elif node.type == NodeType.JUMP:
-            data["jump"] = node.jump_target
+            content = {"jump": node.jump_target}
         
         elif node.type == NodeType.SIGNAL:
             if node.signal_args:
-                data["signal"] = {
-                    "name": node.signal_name,
-                    "args": node.signal_args,
-                }
+                content = {"signal": {"name": node.signal_name, "args": copy(node.signal_args)}}
             else:
-                data["signal"] = node.signal_name
+                content = {"signal": node.signal_name}
         
         elif node.type == NodeType.END:
-            data["end"] = node.outcome if node.outcome else True
+            content = {"end": node.outcome if node.outcome else True}
+        
+        else:
+            content = {}
         
         # Next (for non-branching nodes)
-        if node.next and node.type not in (NodeType.CHOICE, NodeType.IF, NodeType.JUMP, NodeType.END):
-            data["next"] = node.next
+        if node.next and node.type not in _BRANCHING_TYPES:
+            content["next"] = node.next
         
         # UI position (always save to preserve layout)
-        data["ui"] = {
-            "x": round(node.ui_pos.x, 1),
-            "y": round(node.ui_pos.y, 1),
-        }
-        
-        return data
+        content["ui"] = {"x": round(node.ui_pos.x, 1), "y": round(node.ui_pos.y, 1)}
+        return content
 
 
 def validate_yaml_file(file_path: str) -> list[str]:
@@ -21,6 +21,8 @@ import os
 import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -41,6 +43,42 @@ CHARACTER_PRESETS = {
     "woman": "female2",
 }
 
+# Keyword -> character type, for names without a direct preset
+FUZZY_RULES = [
+    (["doctor", "dr."], "doctor"),
+    (["nurse"], "nurse"),
+    (["child", "kid", "boy"], "child"),
+    (["girl"], "girl"),
+    (["old", "elder"], "old_man"),
+    (["woman", "lady", "female", "mother", "mom"], "woman"),
+    (["narrator"], "narrator"),
+    (["whisper"], "whisper"),
+]
+
+# FUZZY_RULES keywords whose type has a preset, as one pattern (rebuilt by load_voice_config)
+_FUZZY_RE: Optional[re.Pattern] = None
+_KW_TO_TYPE: dict[str, str] = {}
+_KW_RANK: dict[str, int] = {}  # Keyword -> position in rule order
+
+
+def _compile_fuzzy_rules():
+    """Compile the usable FUZZY_RULES keywords into a single alternation, in rule order."""
+    global _FUZZY_RE, _KW_TO_TYPE, _KW_RANK
+    
+    _KW_TO_TYPE = {}
+    for keywords, char_type in FUZZY_RULES:
+        if char_type in CHARACTER_PRESETS:
+            for kw in keywords:
+                _KW_TO_TYPE.setdefault(kw, char_type)
+    _KW_RANK = {kw: i for i, kw in enumerate(_KW_TO_TYPE)}
+    # Lookahead finds a keyword at every offset, even overlapping ones
+    _FUZZY_RE = re.compile(
+        "(?=(" + "|".join(re.escape(kw) for kw in _KW_TO_TYPE) + "))"
+    ) if _KW_TO_TYPE else None
+
+
+_compile_fuzzy_rules()
+
 
 def load_voice_config():
     """Load voice configuration from JSON file if it exists."""
@@ -62,6 +100,10 @@ def load_voice_config():
             print(f"Loaded voice config from {VOICE_CONFIG_FILE.name}")
         except Exception as e:
             print(f"Warning: Could not load voice config: {e}")
+    
+    # Presets may have changed; rebuild the matcher and drop memoized lookups
+    _compile_fuzzy_rules()
+    get_preset_for_character.cache_clear()
 
 
 def parse_dtl_file(filepath: Path) -> list[dict]:
@@ -69,45 +111,42 @@ def parse_dtl_file(filepath: Path) -> list[dict]:
     lines = []
     
     with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-    
-    # Dialogic 2 format: each line is an event
-    # Text events look like: [text character="Name"]The text here[/text]
-    # Or simpler format depending on version
-    
-    # Pattern for text events in Dialogic 2 format
-    # Format: "character: text" or just "text"
-    text_pattern = re.compile(r'^(?:(\w+):\s*)?(.+)$', re.MULTILINE)
-    
-    # Try to parse as JSON first (Dialogic saves in JSON)
-    try:
-        data = json.loads(content)
-        if isinstance(data, dict) and "events" in data:
-            for i, event in enumerate(data["events"]):
-                if event.get("event_name") == "dialogic_text_event" or "text" in event:
-                    text = event.get("text", "")
-                    character = event.get("character", "default")
-                    if text.strip():
-                        lines.append({
-                            "index": i,
-                            "text": text,
-                            "character": character,
-                            "event": event
-                        })
-        return lines
-    except json.JSONDecodeError:
-        pass
-    
-    # Fallback: parse as plain text format
-    for i, line in enumerate(content.split("\n")):
-        line = line.strip()
-        if not line or line.startswith("#") or line.startswith("//"):
-            continue
+        # Dialogic 2 format: each line is an event
+        # Text events look like: [text character="Name"]The text here[/text]
+        # Or simpler format depending on version
+        
+        # Try to parse as JSON first (Dialogic saves in JSON)
+        try:
+            data = json.load(f)
+            if isinstance(data, dict) and "events" in data:
+                for i, event in enumerate(data["events"]):
+                    if event.get("event_name") == "dialogic_text_event" or "text" in event:
+                        text = event.get("text", "")
+                        character = event.get("character", "default")
+                        if text.strip():
+                            lines.append({
+                                "index": i,
+                                "text": text,
+                                "character": character,
+                                "event": event
+                            })
+            return lines
+        except json.JSONDecodeError:
+            f.seek(0)
         
-        match = text_pattern.match(line)
-        if match:
-            character = match.group(1) or "default"
-            text = match.group(2)
+        # Fallback: parse as plain text format, streaming the lines
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line or line.startswith("#") or line.startswith("//"):
+                continue
+            
+            # Format: "character: text" or just "text"; the name is a single word (\w+)
+            head, sep, tail = line.partition(":")
+            text = tail.lstrip()
+            if sep and text and head.replace("_", "a").isalnum():
+                character = head
+            else:
+                character, text = "default", line
             if text.strip():
                 lines.append({
                     "index": i,
@@ -119,57 +158,58 @@ def parse_dtl_file(filepath: Path) -> list[dict]:
     return lines
 
 
+@lru_cache(maxsize=256)
 def get_preset_for_character(character: str) -> str:
-    """Get voice preset for a character name."""
+    """Get voice preset for a character name (memoized; load_voice_config clears it)."""
     char_lower = character.lower()
     
     # Direct match
     if char_lower in CHARACTER_PRESETS:
         return CHARACTER_PRESETS[char_lower]
     
-    # Fuzzy matching based on keywords
-    fuzzy_rules = [
-        (["doctor", "dr."], "doctor"),
-        (["nurse"], "nurse"),
-        (["child", "kid", "boy"], "child"),
-        (["girl"], "girl"),
-        (["old", "elder"], "old_man"),
-        (["woman", "lady", "female", "mother", "mom"], "woman"),
-        (["narrator"], "narrator"),
-        (["whisper"], "whisper"),
-    ]
-    
-    for keywords, char_type in fuzzy_rules:
-        for kw in keywords:
-            if kw in char_lower:
-                if char_type in CHARACTER_PRESETS:
-                    return CHARACTER_PRESETS[char_type]
+    # Fuzzy matching based on keywords; the earliest rule wins, wherever it matches
+    if _FUZZY_RE is not None:
+        found = {m.group(1) for m in _FUZZY_RE.finditer(char_lower)}
+        if found:
+            return CHARACTER_PRESETS[_KW_TO_TYPE[min(found, key=_KW_RANK.__getitem__)]]
     
     return CHARACTER_PRESETS["default"]
 
 
-def generate_audio(text: str, output_path: Path, preset: str) -> bool:
-    """Generate gibberish audio for text using gibberish_tts.py."""
-    cmd = [
-        sys.executable,
-        str(GIBBERISH_SCRIPT),
-        text,
-        str(output_path),
-        "--preset", preset
-    ]
+def generate_audio_batch(jobs: list[dict]) -> set[str]:
+    """Generate audio for many lines in one gibberish_tts.py process.
+    
+    Each job is {"text", "output", "preset"}. Returns the outputs that succeeded.
+    """
+    if not jobs:
+        return set()
+    # Parallelism comes from running one process per core, so each renders serially
+    cmd = [sys.executable, str(GIBBERISH_SCRIPT), "--batch", "-", "--jobs", "1"]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            print(f"  Error generating audio: {result.stderr}")
-            return False
-        return True
+        result = subprocess.run(cmd, input=json.dumps(jobs, separators=(",", ":")), capture_output=True, text=True,
+                                timeout=60 * len(jobs))
     except subprocess.TimeoutExpired:
         print(f"  Timeout generating audio")
-        return False
+        return set()
     except Exception as e:
         print(f"  Exception: {e}")
-        return False
+        return set()
+    
+    # One JSON result per line; anything else is diagnostic output
+    succeeded = set()
+    for line in result.stdout.splitlines():
+        try:
+            status = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if status.get("ok"):
+            succeeded.add(status["output"])
+        else:
+            print(f"  Error generating audio for {status.get('output')}: {status.get('error')}")
+    if result.returncode != 0 and result.stderr:
+        print(f"  Error generating audio: {result.stderr}")
+    return succeeded
 
 
 def process_dialogue_file(filepath: Path, dry_run: bool = False) -> dict:
@@ -192,6 +232,7 @@ def process_dialogue_file(filepath: Path, dry_run: bool = False) -> dict:
     
     generated = 0
     audio_mapping = {}
+    jobs = []  # (idx, res_path, job) for the batch run
     
     for line_data in lines:
         idx = line_data["index"]
@@ -208,15 +249,27 @@ def process_dialogue_file(filepath: Path, dry_run: bool = False) -> dict:
         print(f"       -> {audio_filename} (preset: {preset})")
         
         if not dry_run:
-            if generate_audio(text, audio_path, preset):
-                generated += 1
-                audio_mapping[idx] = res_path
-            else:
-                print(f"       FAILED!")
+            jobs.append((idx, res_path, {"text": text, "output": str(audio_path), "preset": preset}))
         else:
             generated += 1
             audio_mapping[idx] = res_path
     
+    # A few TTS processes for the whole file instead of one per line:
+    # lines are dealt round-robin to one batch per CPU core
+    if jobs:
+        batch = [job for _, _, job in jobs]
+        workers = min(os.cpu_count() or 1, len(batch))
+        succeeded = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for done in executor.map(generate_audio_batch, (batch[i::workers] for i in range(workers))):
+                succeeded |= done
+        for idx, res_path, job in jobs:
+            if job["output"] in succeeded:
+                generated += 1
+                audio_mapping[idx] = res_path
+            else:
+                print(f"  [{idx}] FAILED!")
+    
     return {
         "file": str(filepath),
         "lines": len(lines),
@@ -7,21 +7,53 @@ Usage:
     python gibberish_tts.py "text" output.wav --preset male1
     python gibberish_tts.py "text" output.wav --preset female2 --no-fx
     python gibberish_tts.py --list-presets
+    python gibberish_tts.py --batch jobs.json   # или --batch - (JSON из stdin)
+    python gibberish_tts.py --batch jobs.json --jobs 8   # до 8 фраз озвучиваются параллельно
+    python gibberish_tts.py --serve             # задание JSON на строку stdin, ответ сразу
 """
 
 import argparse
-import random
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import io
 import re
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
 import os
+import types
+import wave
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 # Фонемы для генерации
 CONSONANTS = ['b', 'd', 'g', 'k', 'm', 'n', 'p', 'r', 'l', 'v', 'ch', 'br', 'dr', 'gr', 'kr', 'pr', 'tr']
 VOWELS = ['a', 'e', 'i', 'o', 'u', 'a', 'o', 'u']  # a, o, u чаще для "бубнящего" звука
 ENDINGS = ['', 'n', 'm', 'k', 'r', 'l', 's', '']
 
+# Все слоги заранее (повторы в списках сохраняют частоты), чтобы тянуть слог одним вызовом
+SYLLABLES = [c + v + e for c in CONSONANTS for v in VOWELS for e in ENDINGS]
+
+# Те же слоги фонемами espeak-ng (в том же порядке): в [[...]] они озвучиваются
+# без разбора английских правил чтения. Остальные буквы совпадают с фонемами
+CONSONANT_PHONEMES = {'ch': 'tS'}
+VOWEL_PHONEMES = {'a': 'a', 'e': 'E', 'i': 'I', 'o': '0', 'u': 'V'}
+SYLLABLE_PHONEMES = [CONSONANT_PHONEMES.get(c, c) + VOWEL_PHONEMES[v] + e
+                     for c in CONSONANTS for v in VOWELS for e in ENDINGS]
+
+# Токены текста за один проход: слово, серия знаков (пауза по первому знаку) или пробелы
+TOKEN_RE = re.compile(r"(?P<word>[a-zA-Z']+)|(?P<soft>[.,;:\-][.,!?;:\-]*)|(?P<hard>[!?][.,!?;:\-]*)|(?P<ws>\s+)")
+PAUSES = {'soft': b' ...', 'hard': b' .....', 'ws': b' '}
+
 # Пресеты голосов
 PRESETS = {
     # Мужские голоса
@@ -79,8 +111,24 @@ PRESETS = {
     },
 }
 
+# Заголовки групп пресетов по префиксу имени (для --list-presets)
+PRESET_GROUPS = {'male': '👨 МУЖСКИЕ:', 'female': '👩 ЖЕНСКИЕ:', 'child': '👶 ДЕТСКИЕ:'}
+
+
+def _group_presets() -> dict[str, list[str]]:
+    """Раскладывает пресеты по группам за один проход."""
+    groups = {prefix: [] for prefix in PRESET_GROUPS}
+    for name in PRESETS:
+        prefix = next((p for p in PRESET_GROUPS if name.startswith(p)), None)
+        if prefix is not None:
+            groups[prefix].append(name)
+    return groups
+
+
+PRESETS_BY_GROUP = _group_presets()
+
 # Постобработка по умолчанию
-DEFAULT_FX = {
+DEFAULT_FX = types.MappingProxyType({  # Только чтение: свои настройки - через DEFAULT_FX.copy()
     'noise': 0.1,
     'highpass': 300,
     'lowpass': 3000,
@@ -88,120 +136,555 @@ DEFAULT_FX = {
     'eq_gain': 5,
     'echo_delays': '40|60',
     'echo_decays': '0.5|0.3',
-}
+})
+
+# Пакетный запуск espeak-ng: пауза между фразами и нарезка записи по ней
+BATCH_BREAK_MS = 2000   # Заметно длиннее любых пауз внутри фразы (до ~0.5 с)
+BATCH_MIN_BREAK_MS = 1500
+SEGMENT_TAIL_MS = 500   # Хвост тишины после фразы, как у одиночного запуска
+SILENCE_LEVEL = 64
+
+# Пути к утилитам ищутся в PATH один раз
+ESPEAK_NG = shutil.which('espeak-ng') or 'espeak-ng'
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
 
+# Уже озвученные фразы: ключ _render_key -> файл с результатом (LRU)
+RENDER_CACHE_SIZE = 4096
+_rendered: OrderedDict = OrderedDict()
 
-def generate_syllable() -> str:
-    """Генерирует один слог."""
-    return random.choice(CONSONANTS) + random.choice(VOWELS) + random.choice(ENDINGS)
+# Строки результата --batch/--serve: компактный JSON без пробелов
+JSON_COMPACT = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+class _Espeak:
+    """libespeak-ng через ctypes: библиотека и голос грузятся один раз на процесс.
+    
+    Если библиотеки нет, get() возвращает None и generate_audio запускает espeak-ng.
+    """
+    
+    # Константы из speak_lib.h
+    AUDIO_OUTPUT_SYNCHRONOUS = 2
+    POS_CHARACTER = 1
+    espeakRATE = 1
+    espeakPITCH = 3
+    espeakWORDGAP = 7
+    espeakCHARS_AUTO = 0
+    espeakPHONEMES = 0x100
+    espeakENDPAUSE = 0x1000
+    
+    _SynthCallback = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+    
+    _instance = None
+    _tried = False
+    _init_lock = threading.Lock()
+    
+    def __init__(self, lib: ctypes.CDLL):
+        self._lib = lib
+        lib.espeak_Initialize.restype = ctypes.c_int
+        lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        lib.espeak_SetSynthCallback.restype = None
+        lib.espeak_SetSynthCallback.argtypes = [self._SynthCallback]
+        lib.espeak_SetParameter.restype = ctypes.c_int
+        lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.espeak_SetVoiceByName.restype = ctypes.c_int
+        lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        lib.espeak_Synth.restype = ctypes.c_int
+        lib.espeak_Synth.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p,
+        ]
+        
+        # Синхронный режим: espeak_Synth возвращается, когда весь звук отдан в callback
+        self.sample_rate = lib.espeak_Initialize(self.AUDIO_OUTPUT_SYNCHRONOUS, 0, None, 0)
+        if self.sample_rate <= 0:
+            raise OSError('espeak_Initialize failed')
+        
+        self._pcm = bytearray()
+        self._callback = self._SynthCallback(self._on_samples)  # Ссылка нужна, пока жива библиотека
+        lib.espeak_SetSynthCallback(self._callback)
+        self._voice = None
+        self._lock = threading.Lock()  # libespeak-ng не потокобезопасна
+    
+    @classmethod
+    def get(cls) -> Optional['_Espeak']:
+        """Возвращает общий экземпляр или None, если libespeak-ng недоступна."""
+        with cls._init_lock:
+            if not cls._tried:
+                cls._tried = True
+                path = ctypes.util.find_library('espeak-ng') or 'libespeak-ng.so.1'
+                try:
+                    cls._instance = cls(ctypes.CDLL(path))
+                except (OSError, AttributeError):
+                    cls._instance = None
+            return cls._instance
+    
+    def _on_samples(self, wav, numsamples: int, events) -> int:
+        if numsamples > 0:
+            self._pcm += ctypes.string_at(wav, numsamples * 2)
+        return 0  # 0 - продолжать синтез
+    
+    def synth(self, text: str, voice: str, speed: int, pitch: int, gap: int) -> bytes:
+        """Синтезирует текст и возвращает 16-битный моно PCM с частотой sample_rate."""
+        lib = self._lib
+        with self._lock:
+            if voice != self._voice:
+                if lib.espeak_SetVoiceByName(voice.encode()) != 0:
+                    raise ValueError(f'Неизвестный голос espeak-ng: {voice}')
+                self._voice = voice
+            # Те же параметры, что и у ключей -s, -p, -g espeak-ng
+            lib.espeak_SetParameter(self.espeakRATE, speed, 0)
+            lib.espeak_SetParameter(self.espeakPITCH, pitch, 0)
+            lib.espeak_SetParameter(self.espeakWORDGAP, gap, 0)
+            
+            data = text.encode('utf-8')
+            self._pcm = bytearray()
+            flags = self.espeakCHARS_AUTO | self.espeakPHONEMES | self.espeakENDPAUSE
+            if lib.espeak_Synth(data, len(data) + 1, 0, self.POS_CHARACTER, 0, flags, None, None) != 0:
+                raise RuntimeError('espeak_Synth failed')
+            pcm, self._pcm = bytes(self._pcm), bytearray()
+            return pcm
 
 
-def generate_word(length_hint: int) -> str:
-    """Генерирует слово примерно заданной длины."""
-    num_syllables = max(1, length_hint // 3)
-    num_syllables = min(num_syllables, 4)
-    return ''.join(generate_syllable() for _ in range(num_syllables))
+@lru_cache(maxsize=4096)
+def _gibberish_for(word: str, phonemes: bool = False) -> bytes:
+    """Белиберда для слова (ASCII): случайная, но одна и та же для одного слова при любом запуске.
+    
+    С phonemes - те же слоги фонемами espeak-ng в [[...]], с ударением на первом.
+    """
+    num_syllables = min(max(1, len(word) // 3), 4)
+    # Слоги - цифры 64-битного хэша слова по основанию len(SYLLABLES): стабильно между
+    # запусками (в отличие от hash() для str) и без дорогого засева random.Random на слово
+    digest = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+    syllables = SYLLABLE_PHONEMES if phonemes else SYLLABLES
+    parts = []
+    for _ in range(num_syllables):
+        digest, index = divmod(digest, len(syllables))
+        parts.append(syllables[index])
+    if phonemes:
+        return ("[['" + ''.join(parts) + "]]").encode('ascii')
+    return ''.join(parts).encode('ascii')
 
 
-def text_to_gibberish(text: str) -> str:
-    """Конвертирует текст в белиберду, сохраняя паузы."""
-    result = []
-    tokens = re.findall(r"[a-zA-Z']+|[.,!?;:\-]+|\s+", text)
+def text_to_gibberish(text: str, phonemes: bool = False) -> str:
+    """Конвертирует текст в белиберду, сохраняя паузы (одинаковые слова звучат одинаково).
     
-    for token in tokens:
-        if re.match(r"[a-zA-Z']+", token):
-            gibberish = generate_word(len(token))
-            result.append(gibberish)
-        elif re.match(r"[.,;:\-]", token):
-            result.append(' ...')
-        elif re.match(r"[!?]", token):
-            result.append(' .....')
-        elif token.strip() == '':
-            result.append(' ')
+    phonemes=True даёт ввод для espeak-ng: слова фонемами, espeak-ng не читает их по правилам.
+    """
+    # Всё на выходе - ASCII, поэтому собираем байты и декодируем один раз
+    buf = bytearray()
+    append = buf.extend
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'word':
+            append(_gibberish_for(match.group().lower(), phonemes))
+        else:
+            append(PAUSES[kind])
     
-    return ''.join(result)
+    return buf.decode('ascii')
+
+
+def _espeak_cmd(text: str, wav_path: Optional[str], voice: str, speed: int, pitch: int, gap: int,
+                ssml: bool = False) -> list[str]:
+    """Команда запуска espeak-ng с записью в wav_path (None - WAV в stdout)."""
+    return [
+        ESPEAK_NG,
+        '-v', voice,
+        '-s', str(speed),
+        '-p', str(pitch),
+        '-g', str(gap),
+        *(['-m'] if ssml else []),
+        *(['-w', wav_path] if wav_path else ['--stdout']),
+        text
+    ]
+
+
+def _write_wav(path, pcm: bytes, sample_rate: int) -> None:
+    """Записывает 16-битный моно PCM в WAV (путь или файловый объект)."""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_encoders() -> frozenset:
+    """Энкодеры ffmpeg (ffmpeg -encoders запускается один раз на процесс)."""
+    try:
+        result = subprocess.run([FFMPEG, '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+    # Таблица идёт после строки " ------": флаги, имя, описание
+    lines = result.stdout.splitlines()
+    start = next((i + 1 for i, line in enumerate(lines) if line.strip().startswith('---')), len(lines))
+    return frozenset(line.split()[1] for line in lines[start:] if len(line.split()) > 1)
+
+
+def _ffmpeg_has(encoder: str) -> bool:
+    """Есть ли в ffmpeg энкодер с таким именем."""
+    return encoder in _ffmpeg_encoders()
+
+
+def _codec_args(output_path: str) -> list[str]:
+    """Кодек для сжатых форматов: Godot читает Ogg Vorbis и MP3, WAV пишется как есть."""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == '.ogg':
+        if _ffmpeg_has('libvorbis'):
+            return ['-c:a', 'libvorbis']
+        # Без libvorbis ffmpeg положил бы в .ogg FLAC; встроенный энкодер экспериментальный и только стерео
+        return ['-c:a', 'vorbis', '-strict', 'experimental', '-ac', '2']
+    if ext == '.mp3' and _ffmpeg_has('libmp3lame'):
+        return ['-c:a', 'libmp3lame']
+    return []
+
+
+def _fx_filters(fx: dict) -> tuple[str, str]:
+    """Источник шума и граф фильтров ffmpeg для настроек постобработки."""
+    af_filter = (
+        f"highpass=f={fx['highpass']},"
+        f"lowpass=f={fx['lowpass']},"
+        f"equalizer=f={fx['eq_freq']}:t=h:w=500:g={fx['eq_gain']},"
+        f"aecho=0.8:0.75:{fx['echo_delays']}:{fx['echo_decays']}"
+    )
+    # Шум без длительности: amix с duration=shortest обрежет его по речи
+    return f"anoisesrc=c=pink:a={fx['noise']}", f"[1][0]amix=inputs=2:duration=shortest,{af_filter}"
+
+
+# Настройки по умолчанию неизменяемы, их фильтры и ключ кэша считаются один раз
+_DEFAULT_FX_FILTERS = _fx_filters(DEFAULT_FX)
+_DEFAULT_FX_KEY = tuple(sorted(DEFAULT_FX.items()))
+
+
+def _fx_cmd(output_path: str, fx: dict) -> list[str]:
+    """Команда ffmpeg: WAV из stdin + розовый шум, фильтры и эхо -> output_path."""
+    noise, filter_complex = _DEFAULT_FX_FILTERS if fx is DEFAULT_FX else _fx_filters(fx)
+    return [
+        FFMPEG, '-y',
+        '-f', 'wav', '-i', 'pipe:0',
+        '-f', 'lavfi', '-i', noise,
+        '-filter_complex', filter_complex,
+        *_codec_args(output_path),
+        output_path
+    ]
+
+
+def _render_pcm(pcm: bytes, sample_rate: int, output_path: str, apply_fx: bool, fx: dict) -> None:
+    """Сохраняет PCM в output_path; с постобработкой WAV уходит в ffmpeg через stdin."""
+    if apply_fx:
+        buffer = io.BytesIO()
+        _write_wav(buffer, pcm, sample_rate)
+        subprocess.run(_fx_cmd(output_path, fx), input=buffer.getvalue(), check=True, capture_output=True)
+    else:
+        _write_wav(output_path, pcm, sample_rate)
+
+
+def _render_key(text: str, output_path: str, voice: str, speed: int, pitch: int, gap: int,
+                apply_fx: bool, fx: dict) -> tuple:
+    """Всё, от чего зависит результат озвучки (формат - по расширению файла)."""
+    fx_key = _DEFAULT_FX_KEY if fx is DEFAULT_FX else tuple(sorted(fx.items()))
+    return (text, voice, speed, pitch, gap, apply_fx and fx_key, os.path.splitext(output_path)[1].lower())
+
+
+def _reuse_render(key: tuple, output_path: str) -> bool:
+    """Копирует ранее озвученный файл с тем же ключом, если он ещё на месте."""
+    previous = _rendered.get(key)
+    if previous is None or not os.path.exists(previous):
+        return False
+    _rendered.move_to_end(key)
+    if os.path.abspath(previous) != os.path.abspath(output_path):
+        _forget_path(output_path)
+        shutil.copyfile(previous, output_path)
+    return True
+
+
+def _forget_path(output_path: str) -> None:
+    """Забывает фразы, озвученные в этот файл: его сейчас перезапишут."""
+    path = os.path.abspath(output_path)
+    for stale in [k for k, p in _rendered.items() if os.path.abspath(p) == path]:
+        del _rendered[stale]
+
+
+def _remember_render(key: tuple, output_path: str) -> None:
+    """Запоминает озвученный файл."""
+    _rendered[key] = output_path
+    if len(_rendered) > RENDER_CACHE_SIZE:
+        _rendered.popitem(last=False)
 
 
 def generate_audio(text: str, output_path: str, voice: str = 'en+m1', 
                    speed: int = 135, pitch: int = 15, gap: int = 2,
                    apply_fx: bool = True, fx: dict = None) -> None:
-    """Генерирует аудио через espeak-ng + ffmpeg постобработка."""
+    """Генерирует аудио через espeak-ng + ffmpeg постобработка.
+    
+    Повтор уже озвученной в этом процессе фразы копирует готовый файл.
+    """
     
     if fx is None:
         fx = DEFAULT_FX
     
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-        tmp_path = tmp.name
+    key = _render_key(text, output_path, voice, speed, pitch, gap, apply_fx, fx)
+    if _reuse_render(key, output_path):
+        return
+    _forget_path(output_path)
+    _render_text(text, output_path, voice, speed, pitch, gap, apply_fx, fx)
+    _remember_render(key, output_path)
+
+
+def _render_text(text: str, output_path: str, voice: str, speed: int, pitch: int, gap: int,
+                 apply_fx: bool, fx: dict) -> None:
+    """Озвучивает текст в output_path мимо кэша озвучек (можно звать из нескольких потоков)."""
+    # espeak-ng генерация: в процессе через libespeak-ng, иначе отдельным запуском
+    engine = _Espeak.get()
+    if engine is not None:
+        _render_pcm(engine.synth(text, voice, speed, pitch, gap), engine.sample_rate, output_path, apply_fx, fx)
+    elif not apply_fx:
+        subprocess.run(_espeak_cmd(text, output_path, voice, speed, pitch, gap), check=True, capture_output=True)
+    else:
+        # stdout espeak-ng напрямую во вход ffmpeg, без временного WAV
+        espeak = subprocess.Popen(_espeak_cmd(text, None, voice, speed, pitch, gap),
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            subprocess.run(_fx_cmd(output_path, fx), stdin=espeak.stdout, check=True, capture_output=True)
+        finally:
+            espeak.stdout.close()  # ffmpeg упал - espeak-ng не будет ждать читателя
+            _, espeak_err = espeak.communicate()
+        if espeak.returncode != 0:
+            raise subprocess.CalledProcessError(espeak.returncode, espeak.args, stderr=espeak_err)
+
+
+def _split_on_breaks(pcm: bytes, sample_rate: int, count: int) -> Optional[list[bytes]]:
+    """Режет запись пакетного запуска на count фраз по паузам BATCH_BREAK_MS.
+    
+    Возвращает None, если длинных пауз не ровно count - 1 (нарезка неоднозначна).
+    """
+    samples = array('h', pcm)
+    if sys.byteorder == 'big':
+        samples.byteswap()  # WAV хранит little-endian
+    
+    # Тишина ищется окнами по 10 мс: min/max по срезу считаются в C
+    window = sample_rate // 100
+    quiet = [
+        max(chunk) < SILENCE_LEVEL and min(chunk) > -SILENCE_LEVEL
+        for chunk in (samples[i:i + window] for i in range(0, len(samples), window))
+    ]
+    
+    breaks = []  # (начало, конец) длинных пауз в окнах
+    start = None
+    for k, is_quiet in enumerate(quiet + [False]):
+        if is_quiet and start is None:
+            start = k
+        elif not is_quiet and start is not None:
+            if k - start >= BATCH_MIN_BREAK_MS // 10 and 0 < start and k < len(quiet):
+                breaks.append((start, k))
+            start = None
+    if len(breaks) != count - 1:
+        return None
+    
+    tail = SEGMENT_TAIL_MS // 10
+    bounds = [0] + [b for br_start, br_end in breaks for b in (br_start + tail, br_end)] + [len(quiet)]
+    return [samples[a * window:b * window].tobytes() for a, b in zip(bounds[::2], bounds[1::2])]
+
+
+def _synth_batch_cli(texts: list[str], voice: str, speed: int, pitch: int,
+                     gap: int) -> Optional[tuple[list[bytes], int]]:
+    """Синтезирует все фразы одним запуском espeak-ng (SSML с паузами между ними).
     
+    Возвращает PCM каждой фразы и частоту, либо None, если запись не удалось нарезать.
+    """
+    # Белиберда состоит из букв, пробелов, точек и [['...]], экранировать для SSML нечего.
+    # Пробелы вокруг паузы обязательны: вплотную к ]] espeak-ng её теряет
+    ssml = '<speak>' + f' <break time="{BATCH_BREAK_MS}ms"/> '.join(texts) + '</speak>'
+    
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+        batch_path = tmp.name
     try:
-        # espeak-ng генерация
-        cmd_espeak = [
-            'espeak-ng',
-            '-v', voice,
-            '-s', str(speed),
-            '-p', str(pitch),
-            '-g', str(gap),
-            '-w', tmp_path,
-            text
-        ]
-        subprocess.run(cmd_espeak, check=True, capture_output=True)
-        
-        if apply_fx:
-            # Получаем длительность
-            result = subprocess.run(
-                ['ffprobe', '-i', tmp_path, '-show_entries', 'format=duration', 
-                 '-v', 'quiet', '-of', 'csv=p=0'],
-                capture_output=True, text=True
-            )
-            duration = float(result.stdout.strip())
-            
-            # Фильтр постобработки
-            af_filter = (
-                f"highpass=f={fx['highpass']},"
-                f"lowpass=f={fx['lowpass']},"
-                f"equalizer=f={fx['eq_freq']}:t=h:w=500:g={fx['eq_gain']},"
-                f"aecho=0.8:0.75:{fx['echo_delays']}:{fx['echo_decays']}"
-            )
-            
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_noise:
-                tmp_noise_path = tmp_noise.name
-            
-            # Генерируем шум и микшируем
-            cmd_ffmpeg = [
-                'ffmpeg', '-y',
-                '-f', 'lavfi', '-i', f"anoisesrc=d={duration}:c=pink:a={fx['noise']}",
-                '-i', tmp_path,
-                '-filter_complex', f"[0][1]amix=inputs=2:duration=shortest,{af_filter}",
-                output_path
-            ]
-            subprocess.run(cmd_ffmpeg, check=True, capture_output=True)
-        else:
-            # Без постобработки - просто копируем
-            import shutil
-            shutil.copy(tmp_path, output_path)
-        
+        subprocess.run(_espeak_cmd(ssml, batch_path, voice, speed, pitch, gap, ssml=True),
+                       check=True, capture_output=True)
+        with wave.open(batch_path, 'rb') as wav:
+            sample_rate = wav.getframerate()
+            pcm = wav.readframes(wav.getnframes())
     finally:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+        try:
+            os.unlink(batch_path)
+        except FileNotFoundError:
+            pass
+    
+    segments = _split_on_breaks(pcm, sample_rate, len(texts))
+    return (segments, sample_rate) if segments is not None else None
 
 
-def list_presets():
-    """Выводит список пресетов."""
-    print("\n📢 Доступные пресеты голосов:\n")
+def generate_audio_batch(texts: list[str], output_paths: list[str], voice: str = 'en+m1',
+                         speed: int = 135, pitch: int = 15, gap: int = 2,
+                         apply_fx: bool = True, fx: dict = None,
+                         workers: int = 1) -> list[Optional[str]]:
+    """Озвучивает несколько фраз одним голосом. Возвращает ошибку (или None) для каждой.
     
-    print("👨 МУЖСКИЕ:")
-    for name, p in PRESETS.items():
-        if name.startswith('male'):
-            print(f"  {name:10} - {p['desc']:25} (voice={p['voice']}, pitch={p['pitch']}, speed={p['speed']})")
+    Без libespeak-ng все фразы синтезируются одним запуском espeak-ng вместо запуска на фразу.
+    До workers фраз одновременно проходят постобработку ffmpeg (или espeak-ng по одной).
+    """
+    if fx is None:
+        fx = DEFAULT_FX
     
-    print("\n👩 ЖЕНСКИЕ:")
-    for name, p in PRESETS.items():
-        if name.startswith('female'):
-            print(f"  {name:10} - {p['desc']:25} (voice={p['voice']}, pitch={p['pitch']}, speed={p['speed']})")
+    # Синтезируется только первое вхождение фразы, которой ещё нет на диске; остальное копируется
+    keys = [_render_key(text, output_path, voice, speed, pitch, gap, apply_fx, fx)
+            for text, output_path in zip(texts, output_paths)]
+    errors: list[Optional[str]] = [None] * len(texts)
+    first: dict[tuple, int] = {}
+    todo = []
+    for i, key in enumerate(keys):
+        if key in first:
+            continue
+        first[key] = i
+        try:
+            if not _reuse_render(key, output_paths[i]):
+                todo.append(i)
+        except OSError as e:
+            errors[i] = str(e)
+    
+    batch = None
+    if len(todo) > 1 and _Espeak.get() is None:
+        try:
+            batch = _synth_batch_cli([texts[i] for i in todo], voice, speed, pitch, gap)
+        except (OSError, subprocess.CalledProcessError, wave.Error):
+            batch = None  # Озвучим по одной
+    
+    def render(n: int, i: int) -> Optional[str]:
+        try:
+            if batch is None:
+                _render_text(texts[i], output_paths[i], voice, speed, pitch, gap, apply_fx, fx)
+            else:
+                segments, sample_rate = batch
+                _render_pcm(segments[n], sample_rate, output_paths[i], apply_fx, fx)
+        except Exception as e:
+            return str(e)
+        return None
+    
+    # Потоки ждут внешние процессы; кэш озвучек обновляется только здесь
+    for i in todo:
+        _forget_path(output_paths[i])
+    workers = min(workers, len(todo))
+    with ThreadPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        results = (executor.map if executor else map)(render, range(len(todo)), todo)
+        for i, error in zip(todo, results):
+            if error is None:
+                _remember_render(keys[i], output_paths[i])
+            else:
+                errors[i] = error
+    
+    for i, key in enumerate(keys):
+        j = first[key]
+        if j == i:
+            continue
+        try:
+            if errors[j] is not None:
+                errors[i] = errors[j]
+            elif not _reuse_render(key, output_paths[i]):
+                generate_audio(texts[i], output_paths[i], voice=voice, speed=speed, pitch=pitch, gap=gap,
+                               apply_fx=apply_fx, fx=fx)
+        except Exception as e:
+            errors[i] = str(e)
+    return errors
+
+
+def run_batch(source: str, apply_fx: bool = True, workers: int = 1) -> int:
+    """Озвучивает список заданий за один запуск процесса.
     
-    print("\n👶 ДЕТСКИЕ:")
-    for name, p in PRESETS.items():
-        if name.startswith('child'):
+    source - путь к JSON-файлу или '-' для stdin. Задание: {"text", "output", "preset"}.
+    На каждое задание в stdout печатается строка JSON с результатом.
+    Возвращает число неудачных заданий.
+    """
+    if source == '-':
+        jobs = json.load(sys.stdin)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+    if not isinstance(jobs, list):
+        print(json.dumps({'output': None, 'ok': False, 'error': 'Ожидался список заданий JSON'},
+                         **JSON_COMPACT), flush=True)
+        return 1
+    return _run_jobs(jobs, apply_fx, workers)
+
+
+def serve(apply_fx: bool = True) -> int:
+    """Постоянный процесс: задание JSON на строку stdin, строка JSON с результатом в stdout.
+    
+    Ответ печатается сразу после задания, до конца stdin; голос libespeak-ng и кэш
+    озвучек живут между заданиями. Возвращает число неудачных заданий.
+    """
+    failed = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            failed += 1
+            print(json.dumps({'output': None, 'ok': False, 'error': str(e)}, **JSON_COMPACT), flush=True)
+            continue
+        failed += _run_jobs([job], apply_fx)
+    return failed
+
+
+def _job_error(job) -> Optional[str]:
+    """Проверяет задание {"text", "output", "preset"}. Возвращает текст ошибки или None."""
+    if not isinstance(job, dict):
+        return 'Задание должно быть объектом JSON'
+    missing = [key for key in ('text', 'output', 'preset') if not isinstance(job.get(key), str)]
+    if missing:
+        return f'В задании нет строковых полей: {", ".join(missing)}'
+    return None
+
+
+def _run_jobs(jobs: list[dict], apply_fx: bool, workers: int = 1) -> int:
+    """Озвучивает задания, печатая результат каждого. Возвращает число неудачных."""
+    # Задания одного пресета озвучиваются вместе
+    by_preset: dict[str, list[dict]] = {}
+    failed = 0
+    for job in jobs:
+        error = _job_error(job)
+        if error is None and job['preset'] not in PRESETS:
+            error = f"Неизвестный пресет: {job['preset']}"
+        if error is None:
+            by_preset.setdefault(job['preset'], []).append(job)
+        else:
+            # Битое задание получает свою строку с ошибкой, остальные озвучиваются
+            failed += 1
+            output = job.get('output') if isinstance(job, dict) else None
+            result = {'output': output if isinstance(output, str) else None, 'ok': False, 'error': error}
+            print(json.dumps(result, **JSON_COMPACT), flush=True)
+    
+    for name, group in by_preset.items():
+        preset = PRESETS[name]
+        errors = generate_audio_batch(
+            [text_to_gibberish(job['text'], phonemes=True) for job in group],
+            [job['output'] for job in group],
+            voice=preset['voice'],
+            speed=preset['speed'],
+            pitch=preset['pitch'],
+            gap=preset['gap'],
+            apply_fx=apply_fx,
+            workers=workers,
+        )
+        for job, error in zip(group, errors):
+            if error is None:
+                result = {'output': job['output'], 'ok': True}
+            else:
+                failed += 1
+                result = {'output': job['output'], 'ok': False, 'error': error}
+            print(json.dumps(result, **JSON_COMPACT), flush=True)
+    
+    return failed
+
+
+def list_presets():
+    """Выводит список пресетов."""
+    print("\n📢 Доступные пресеты голосов:")
+    
+    for prefix, names in PRESETS_BY_GROUP.items():
+        print(f"\n{PRESET_GROUPS[prefix]}")
+        for name in names:
+            p = PRESETS[name]
             print(f"  {name:10} - {p['desc']:25} (voice={p['voice']}, pitch={p['pitch']}, speed={p['speed']})")
     
     print("\n🎛️  Постобработка по умолчанию:")
@@ -225,6 +708,10 @@ def main():
     parser.add_argument('--highpass', type=int, help='Highpass фильтр Hz')
     parser.add_argument('--show-gibberish', action='store_true', help='Показать текст')
     parser.add_argument('--list-presets', '-l', action='store_true', help='Список пресетов')
+    parser.add_argument('--batch', metavar='JSON', help='Список заданий из JSON-файла или stdin (-)')
+    parser.add_argument('--serve', action='store_true', help='Постоянный процесс: задания построчно из stdin')
+    parser.add_argument('--jobs', '-j', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Сколько фраз озвучивать параллельно в --batch')
     
     args = parser.parse_args()
     
@@ -232,6 +719,12 @@ def main():
         list_presets()
         return
     
+    if args.batch:
+        sys.exit(1 if run_batch(args.batch, apply_fx=not args.no_fx, workers=args.jobs) else 0)
+    
+    if args.serve:
+        sys.exit(1 if serve(apply_fx=not args.no_fx) else 0)
+    
     if not args.input or not args.output:
         parser.print_help()
         return
@@ -268,15 +761,13 @@ def main():
     if args.highpass: fx['highpass'] = args.highpass
     
     # Генерируем белиберду
-    gibberish = text_to_gibberish(text)
-    
     if args.show_gibberish:
         print(f"Оригинал: {text}")
-        print(f"Белиберда: {gibberish}")
+        print(f"Белиберда: {text_to_gibberish(text)}")
     
     # Генерируем аудио
     generate_audio(
-        gibberish, 
+        text_to_gibberish(text, phonemes=True),
         args.output,
         voice=voice,
         speed=speed,
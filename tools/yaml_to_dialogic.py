@@ -8,13 +8,21 @@ Usage:
     python yaml_to_dialogic.py                      # Convert all
     python yaml_to_dialogic.py --validate           # Validate only
     python yaml_to_dialogic.py --dry-run            # Show what would be generated
+    python yaml_to_dialogic.py --force              # Regenerate up-to-date files too
 """
 
 import argparse
+import hashlib
+import io
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Collection, Optional, Sequence, TextIO
 
 try:
     import yaml
@@ -22,11 +30,43 @@ except ImportError:
     print("ERROR: PyYAML not installed. Run: pip install pyyaml")
     sys.exit(1)
 
+# libyaml bindings parse several times faster; fall back when PyYAML is built without them
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 # Paths relative to project root
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "dialogues"
 OUT_DIR = PROJECT_ROOT / "dialogues_generated"
 CHARACTERS_DIR = OUT_DIR / "characters"
+# {yaml name: {"hash", "id"}} for files converted by earlier runs; hidden from Godot
+MANIFEST_NAME = ".manifest.json"
+
+# Dialogic uses Godot's var_to_str format which requires @path;
+# the layout must match what dict_to_inst() expects
+_DCH_TEMPLATE = """{{
+"@path": "res://addons/dialogic/Resources/character.gd",
+"@subpath": NodePath(""),
+"display_name": "{name}",
+"nicknames": [],
+"color": Color(1, 1, 1, 1),
+"description": "",
+"scale": 1.0,
+"offset": Vector2(0, 0),
+"mirror": false,
+"default_portrait": "",
+"portraits": {portraits},
+"custom_info": {{}}
+}}"""
+
+
+@lru_cache(maxsize=None)
+def _character_resource(name: str, portrait: Optional[str]) -> str:
+    """Fill the .dch template. Characters shared by dialogues are formatted once per process."""
+    portraits = "{}" if portrait is None else f'{{"default": {{"scene": "", "image": "{portrait}"}}}}'
+    return _DCH_TEMPLATE.format(name=name, portraits=portraits)
 
 
 class DialogueConverter:
@@ -58,180 +98,319 @@ class DialogueConverter:
         if not self.nodes:
             self.errors.append("Missing required field: 'nodes' (or empty)")
         
-        # Validate node references
-        for node_id, node_data in self.nodes.items():
-            self._validate_node(node_id, node_data)
+        # Validate node references. Membership is tested on the dict itself: measured
+        # faster than a keys view or a frozenset copy, which also costs a pass to build
+        nodes = self.nodes
+        validate_node = self._validate_node
+        for node_id, node_data in nodes.items():
+            validate_node(node_id, node_data, nodes)
         
         return len(self.errors) == 0
     
-    def _validate_node(self, node_id: str, node: dict) -> None:
-        """Validate a single node."""
+    def _validate_node(self, node_id: str, node: dict, node_ids: Collection[str]) -> None:
+        """Validate a single node against the dialogue's node IDs."""
         if not isinstance(node, dict):
             self.errors.append(f"Node '{node_id}' must be a dictionary")
             return
         
         # Check 'next' references
         next_node = node.get("next")
-        if next_node and next_node not in self.nodes:
+        if next_node and next_node not in node_ids:
             self.errors.append(f"Node '{node_id}': 'next' references unknown node '{next_node}'")
         
         # Check choice references
         if "choice" in node:
             for i, choice in enumerate(node["choice"]):
                 choice_next = choice.get("next")
-                if choice_next and choice_next not in self.nodes:
+                if choice_next and choice_next not in node_ids:
                     self.errors.append(f"Node '{node_id}' choice {i}: references unknown node '{choice_next}'")
     
-    def convert(self) -> str:
-        """Convert to Dialogic 2 timeline text format (.dtl)."""
-        lines = []
+    def convert(self, out: TextIO) -> int:
+        """Write the Dialogic 2 timeline text (.dtl) to out. Returns the line count."""
+        line_count = 0
         
-        # Process nodes in order starting from start_node
+        def write(lines: Sequence[str]) -> None:
+            nonlocal line_count
+            text = '\n'.join(lines)
+            out.write(('\n' if line_count else '') + text)
+            # Say text may hold newlines of its own; count the lines actually written
+            line_count += text.count('\n') + 1
+        
+        # Process nodes in order starting from start_node. An explicit stack replaces
+        # recursion: entries are (node_id, indent) to visit or lines held back until
+        # the choice branch before them is done
+        nodes = self.nodes
+        process_node = self._process_node_content
         visited = set()
-        self._process_node_chain(self.start_node, lines, visited, indent=0)
+        stack: list = [(self.start_node, 0)]
+        while stack:
+            entry = stack.pop()
+            if isinstance(entry, str):
+                write((entry,))
+                continue
+            node_id, indent = entry
+            if node_id in visited or node_id not in nodes:
+                continue
+            visited.add(node_id)
+            
+            # A node's own lines are collected and written in one call
+            chunk: list[str] = []
+            pending = process_node(nodes[node_id], chunk.append, indent)
+            if chunk:
+                write(chunk)
+            stack.extend(reversed(pending))
         
-        return '\n'.join(lines)
+        return line_count
     
-    def _process_node_chain(self, node_id: str, lines: list, visited: set, indent: int = 0) -> None:
-        """Process a node and follow its chain."""
-        if node_id in visited or node_id not in self.nodes:
-            return
-        visited.add(node_id)
+    def _process_node_content(self, node: dict, emit: Callable[[str], None], indent: int) -> list:
+        """Process the content of a single node.
         
-        node = self.nodes[node_id]
+        Returns what comes after it, in order: (node_id, indent) to follow or lines.
+        """
         prefix = '\t' * indent
+        pending = []
         
-        # Process node content
-        self._process_node_content(node, lines, prefix, visited, indent)
+        # Handlers run in a fixed order, whatever the key order in the YAML
+        for key, handler in self._NODE_HANDLERS:
+            if key in node and handler(self, node[key], prefix, indent, emit, pending):
+                return pending  # Choices, end and jump don't follow 'next'
+        
+        # Follow 'next' if present
+        next_node = node.get("next")
+        if next_node:
+            pending.append((next_node, indent))
+        return pending
+    
+    # Node handlers: emit the event for one key, return True if 'next' must not be followed
     
-    def _process_node_content(self, node: dict, lines: list, prefix: str, visited: set, indent: int) -> None:
-        """Process the content of a single node."""
+    def _emit_say(self, say_data: Any, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """Say event: "character: Text"."""
+        if isinstance(say_data, dict):
+            speaker = say_data.get("speaker", "")
+            text = say_data.get("text", "")
+        else:
+            speaker = ""
+            text = str(say_data)
         
-        # Say event: "character: Text"
-        if "say" in node:
-            say_data = node["say"]
-            if isinstance(say_data, dict):
-                speaker = say_data.get("speaker", "")
-                text = say_data.get("text", "")
-            else:
-                speaker = ""
-                text = str(say_data)
+        if speaker:
+            emit(f"{prefix}{speaker}: {text}")
+        else:
+            emit(f"{prefix}{text}")
+        return False
+    
+    def _emit_choice(self, choices: list, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """Choice event: each option line, then its branch one level deeper."""
+        for choice in choices:
+            choice_text = choice.get("text", "")
+            choice_next = choice.get("next", "")
             
-            if speaker:
-                lines.append(f"{prefix}{speaker}: {text}")
-            else:
-                lines.append(f"{prefix}{text}")
-        
-        # Choice event
-        if "choice" in node:
-            for choice in node["choice"]:
-                choice_text = choice.get("text", "")
-                choice_next = choice.get("next", "")
-                
-                lines.append(f"{prefix}- {choice_text}")
-                
-                # Process choice branch
-                if choice_next and choice_next not in visited:
-                    self._process_node_chain(choice_next, lines, visited, indent + 1)
+            pending.append(f"{prefix}- {choice_text}")
             
-            return  # Don't follow 'next' after choices
-        
-        # Set variables
-        if "set" in node:
-            for var_path, value in node["set"].items():
-                if isinstance(value, bool):
-                    val_str = "true" if value else "false"
-                else:
-                    val_str = str(value)
-                lines.append(f"{prefix}[set {var_path} = {val_str}]")
-        
-        # End
-        if node.get("end"):
-            end_value = node.get("end")
-            if end_value is True:
-                lines.append(f"{prefix}[end]")
-            else:
-                lines.append(f"{prefix}[end {end_value}]")
-            return
-        
-        # Jump
-        if "jump" in node:
-            lines.append(f"{prefix}[jump {node['jump']}]")
-            return
-        
-        # Signal
-        if "signal" in node:
-            sig = node["signal"]
-            if isinstance(sig, dict):
-                sig_name = sig.get("name", "")
+            # Process choice branch
+            if choice_next:
+                pending.append((choice_next, indent + 1))
+        return True
+    
+    def _emit_set(self, assignments: dict, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """Set variables."""
+        for var_path, value in assignments.items():
+            if isinstance(value, bool):
+                val_str = "true" if value else "false"
             else:
-                sig_name = str(sig)
-            lines.append(f"{prefix}[signal {sig_name}]")
-        
-        # Follow 'next' if present
-        next_node = node.get("next")
-        if next_node:
-            self._process_node_chain(next_node, lines, visited, indent)
+                val_str = str(value)
+            emit(f"{prefix}[set {var_path} = {val_str}]")
+        return False
+    
+    def _emit_end(self, end_value: Any, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """End, optionally with an outcome (a false value is no end at all)."""
+        if not end_value:
+            return False
+        if end_value is True:
+            emit(f"{prefix}[end]")
+        else:
+            emit(f"{prefix}[end {end_value}]")
+        return True
+    
+    def _emit_jump(self, target: Any, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """Jump to another timeline."""
+        emit(f"{prefix}[jump {target}]")
+        return True
+    
+    def _emit_signal(self, sig: Any, prefix: str, indent: int, emit: Callable[[str], None], pending: list) -> bool:
+        """Signal event."""
+        if isinstance(sig, dict):
+            sig_name = sig.get("name", "")
+        else:
+            sig_name = str(sig)
+        emit(f"{prefix}[signal {sig_name}]")
+        return False
+    
+    _NODE_HANDLERS = (
+        ("say", _emit_say),
+        ("choice", _emit_choice),
+        ("set", _emit_set),
+        ("end", _emit_end),
+        ("jump", _emit_jump),
+        ("signal", _emit_signal),
+    )
     
     def generate_characters(self) -> dict[str, str]:
         """Generate Dialogic 2 character resources (.dch). Returns {id: content}."""
         result = {}
         for char_id, char_data in self.characters.items():
-            # Dialogic uses Godot's var_to_str format which requires @path
-            # Format must match what dict_to_inst() expects
-            portraits_dict = {}
-            if "portrait" in char_data:
-                portraits_dict["default"] = {
-                    "scene": "",
-                    "image": char_data["portrait"],
-                }
-            
-            # Build the dict string in Godot's var_to_str format
-            lines = [
-                '{',
-                '"@path": "res://addons/dialogic/Resources/character.gd",',
-                '"@subpath": NodePath(""),',
-                f'"display_name": "{char_data.get("name", char_id)}",',
-                '"nicknames": [],',
-                '"color": Color(1, 1, 1, 1),',
-                '"description": "",',
-                '"scale": 1.0,',
-                '"offset": Vector2(0, 0),',
-                '"mirror": false,',
-                '"default_portrait": "",',
-            ]
-            
-            # Add portraits
-            if portraits_dict:
-                portrait_str = '{'
-                for pname, pdata in portraits_dict.items():
-                    portrait_str += f'"{pname}": {{"scene": "", "image": "{pdata["image"]}"}}, '
-                portrait_str = portrait_str.rstrip(', ') + '}'
-                lines.append(f'"portraits": {portrait_str},')
-            else:
-                lines.append('"portraits": {},')
-            
-            lines.append('"custom_info": {}')
-            lines.append('}')
-            
-            result[char_id] = '\n'.join(lines)
+            portrait = str(char_data["portrait"]) if "portrait" in char_data else None
+            result[char_id] = _character_resource(str(char_data.get("name", char_id)), portrait)
         
         return result
 
 
-def convert_all(validate_only: bool = False, dry_run: bool = False) -> int:
+def _source_hash(yaml_file: Path, converter_digest: bytes) -> str:
+    """Hash of a YAML source together with the converter that turns it into output."""
+    h = hashlib.blake2b(converter_digest, digest_size=16)
+    h.update(yaml_file.read_bytes())
+    return h.hexdigest()
+
+
+def _load_manifest() -> dict:
+    """Source hashes, dialogue IDs and characters from the last run ({} if there is none)."""
+    try:
+        manifest = json.loads((OUT_DIR / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _convert_one(yaml_file: Path, validate_only: bool = False) -> dict:
+    """Load, validate and convert one YAML file (runs in a worker process).
+    
+    Returns what convert_all reports or writes for the file.
+    """
+    try:
+        # Hand libyaml the raw bytes; it detects the encoding itself
+        with open(yaml_file, "rb") as f:
+            data = yaml.load(f, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        return {"yaml_error": str(e)}
+    
+    if not data:
+        return {"empty": True}
+    
+    converter = DialogueConverter(data, yaml_file.name)
+    result = {
+        "valid": converter.validate(),
+        "errors": converter.errors,
+        "warnings": converter.warnings,
+    }
+    if result["valid"] and not validate_only:
+        result["dialogue_id"] = converter.dialogue_id
+        dtl = io.StringIO()
+        result["dtl_lines"] = converter.convert(dtl)
+        result["dtl"] = dtl.getvalue()
+        result["characters"] = converter.generate_characters()
+    return result
+
+
+def _atomic_write(path: Path, content: str):
+    """Write content next to path, then move it into place in one rename."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    data = memoryview(content.encode("utf-8"))
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # os.write may write less than asked; keep going until all of it is out
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _report_one(yaml_file: Path, result: dict, validate_only: bool, dry_run: bool,
+                character_writes: dict[Path, str]) -> int:
+    """Print and write the outcome of _convert_one. Returns the number of errors.
+    
+    Character files are queued in character_writes instead, since dialogues share them.
+    """
+    print(f"\n--- {yaml_file.name} ---")
+    
+    if "yaml_error" in result:
+        print(f"  ERROR: Invalid YAML: {result['yaml_error']}")
+        return 1
+    
+    if result.get("empty"):
+        print(f"  WARNING: Empty file, skipping")
+        return 0
+    
+    # Validate
+    if not result["valid"]:
+        for err in result["errors"]:
+            print(f"  ERROR: {err}")
+        return len(result["errors"])
+    
+    for warn in result["warnings"]:
+        print(f"  WARNING: {warn}")
+    
+    if validate_only:
+        print(f"  ✓ Valid")
+        return 0
+    
+    # Convert
+    dtl_content = result["dtl"]
+    out_file = OUT_DIR / f"{result['dialogue_id']}.dtl"
+    
+    if dry_run:
+        print(f"  Would generate: {out_file}")
+        print("  --- Content preview ---")
+        for line in dtl_content.split('\n', 10)[:10]:
+            print(f"    {line}")
+        newlines = result["dtl_lines"] - 1
+        if newlines > 10:
+            print(f"    ... ({newlines - 10} more lines)")
+    else:
+        _atomic_write(out_file, dtl_content)
+        print(f"  ✓ Generated: {out_file.name}")
+    
+    # Generate characters
+    for char_id, char_content in result["characters"].items():
+        char_file = CHARACTERS_DIR / f"{char_id}.dch"
+        if dry_run:
+            print(f"  Would generate character: {char_file.name}")
+        else:
+            character_writes[char_file] = char_content
+            print(f"  ✓ Character: {char_file.name}")
+    
+    return 0
+
+
+def convert_all(validate_only: bool = False, dry_run: bool = False, force: bool = False) -> int:
     """Convert all YAML files. Returns exit code."""
     if not SRC_DIR.exists():
         print(f"ERROR: Source directory not found: {SRC_DIR}")
         return 1
     
-    yaml_files = list(SRC_DIR.glob("*.yaml")) + list(SRC_DIR.glob("*.yml"))
+    # One directory scan for both extensions; .yaml files stay listed before .yml
+    yaml_files, yml_files = [], []
+    with os.scandir(SRC_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".yaml") and entry.is_file():
+                yaml_files.append(Path(entry.path))
+            elif entry.name.endswith(".yml") and entry.is_file():
+                yml_files.append(Path(entry.path))
+    yaml_files += yml_files
     
     if not yaml_files:
         print(f"No YAML files found in {SRC_DIR}")
         return 0
     
     print(f"Found {len(yaml_files)} dialogue file(s)")
+    if SafeLoader is yaml.SafeLoader:
+        print("NOTE: PyYAML built without libyaml, using the slower pure-Python loader")
     
     # Ensure output directory exists
     if not dry_run and not validate_only:
@@ -239,64 +418,53 @@ def convert_all(validate_only: bool = False, dry_run: bool = False) -> int:
         CHARACTERS_DIR.mkdir(parents=True, exist_ok=True)
     
     total_errors = 0
+    character_writes: dict[Path, str] = {}  # Last dialogue to define a character wins
     
-    for yaml_file in yaml_files:
-        print(f"\n--- {yaml_file.name} ---")
-        
-        try:
-            with open(yaml_file, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            print(f"  ERROR: Invalid YAML: {e}")
-            total_errors += 1
-            continue
-        
-        if not data:
-            print(f"  WARNING: Empty file, skipping")
-            continue
-        
-        converter = DialogueConverter(data, yaml_file.name)
-        
-        # Validate
-        if not converter.validate():
-            for err in converter.errors:
-                print(f"  ERROR: {err}")
-            total_errors += len(converter.errors)
-            continue
-        
-        for warn in converter.warnings:
-            print(f"  WARNING: {warn}")
-        
-        if validate_only:
-            print(f"  ✓ Valid")
-            continue
-        
-        # Convert
-        dtl_content = converter.convert()
-        out_file = OUT_DIR / f"{converter.dialogue_id}.dtl"
-        
-        if dry_run:
-            print(f"  Would generate: {out_file}")
-            print("  --- Content preview ---")
-            for line in dtl_content.split('\n')[:10]:
-                print(f"    {line}")
-            if dtl_content.count('\n') > 10:
-                print(f"    ... ({dtl_content.count(chr(10)) - 10} more lines)")
-        else:
-            with open(out_file, "w", encoding="utf-8") as f:
-                f.write(dtl_content)
-            print(f"  ✓ Generated: {out_file.name}")
-        
-        # Generate characters
-        characters = converter.generate_characters()
-        for char_id, char_content in characters.items():
-            char_file = CHARACTERS_DIR / f"{char_id}.dch"
-            if dry_run:
-                print(f"  Would generate character: {char_file.name}")
-            else:
-                with open(char_file, "w", encoding="utf-8") as f:
-                    f.write(char_content)
-                print(f"  ✓ Character: {char_file.name}")
+    # Skip files whose content (and the converter) is unchanged since they were last converted
+    hashes: dict[Path, str] = {}
+    manifest = {}
+    up_to_date = set()
+    if not (validate_only or dry_run):
+        converter_digest = hashlib.blake2b(Path(__file__).read_bytes()).digest()
+        hashes = {f: _source_hash(f, converter_digest) for f in yaml_files}
+        if not force:
+            old_manifest = _load_manifest()
+            for yaml_file, source_hash in hashes.items():
+                entry = old_manifest.get(yaml_file.name)
+                if (isinstance(entry, dict) and entry.get("hash") == source_hash
+                        and isinstance(entry.get("characters"), dict)
+                        and (OUT_DIR / f"{entry.get('id')}.dtl").exists()):
+                    up_to_date.add(yaml_file)
+                    manifest[yaml_file.name] = entry
+    stale_files = [f for f in yaml_files if f not in up_to_date]
+    
+    # Files are parsed and converted in worker processes; reporting and writes
+    # stay here so the output keeps file order
+    workers = min(len(stale_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        results = (executor.map if executor else map)(_convert_one, stale_files, repeat(validate_only))
+        for yaml_file in yaml_files:
+            if yaml_file in up_to_date:
+                print(f"\n--- {yaml_file.name} ---")
+                print(f"  Up to date, skipping (use --force to regenerate)")
+                # Its characters still count, so shared .dch files match a full run
+                for char_id, char_content in manifest[yaml_file.name]["characters"].items():
+                    character_writes[CHARACTERS_DIR / f"{char_id}.dch"] = char_content
+                continue
+            result = next(results)
+            total_errors += _report_one(yaml_file, result, validate_only, dry_run, character_writes)
+            if yaml_file in hashes and "dtl" in result:
+                manifest[yaml_file.name] = {
+                    "hash": hashes[yaml_file],
+                    "id": result["dialogue_id"],
+                    "characters": result["characters"],
+                }
+    
+    # Each shared character is written once per run, not once per dialogue using it
+    for char_file, char_content in character_writes.items():
+        _atomic_write(char_file, char_content)
+    if hashes:
+        _atomic_write(OUT_DIR / MANIFEST_NAME, json.dumps(manifest, separators=(",", ":"), sort_keys=True))
     
     print(f"\n{'='*40}")
     if total_errors > 0:
@@ -311,10 +479,11 @@ def main():
     parser = argparse.ArgumentParser(description="Convert YAML dialogues to Dialogic 2 format")
     parser.add_argument("--validate", action="store_true", help="Validate only, don't generate")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be generated")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if output is up to date")
     
     args = parser.parse_args()
     
-    exit_code = convert_all(validate_only=args.validate, dry_run=args.dry_run)
+    exit_code = convert_all(validate_only=args.validate, dry_run=args.dry_run, force=args.force)
     sys.exit(exit_code)
 
 